@@ -0,0 +1,233 @@
+import threading
+import time
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from django.db.models import Max, Min
+from django.utils import timezone
+
+from .cache import TTLCache
+from .history import ensure_history, market_timezone
+from .models import PriceBar
+from .registry import registry
+from .screener import get_universe, quote_column
+
+# Betaların hesaplandığı endeks; PriceBar'da şirketlerle birlikte saklanır
+ANALYTICS_BENCHMARK = getattr(settings, 'ANALYTICS_BENCHMARK', 'XU100.IS')
+# Korelasyon ve kovaryansın hesaplandığı günlük getiri penceresi (işlem günü)
+ANALYTICS_WINDOW = getattr(settings, 'ANALYTICS_WINDOW', 252)
+# Bir çift için sonuç verilmesi için gereken en az ortak gün
+ANALYTICS_MIN_PERIODS = getattr(settings, 'ANALYTICS_MIN_PERIODS', 20)
+
+# Evren (semboller) -> ReturnStats. Süre dolunca baştan hesaplanır, bu da
+# artımlı güncellemelerin biriktirdiği kayan nokta hatasını sıfırlar.
+stats_cache = TTLCache(
+    ttl=getattr(settings, 'ANALYTICS_CACHE_TTL', 6 * 60 * 60),
+    maxsize=4,
+)
+_lock = threading.Lock()
+
+
+def daily_closes(symbols, since=None, window=ANALYTICS_WINDOW):
+    """Daily closes as a market-date x symbol frame, columns in ``symbols`` order.
+
+    Without ``since`` only enough calendar days for ``window`` returns are read.
+    """
+    if since is None:
+        since = timezone.now() - timedelta(days=window * 7 // 5 + 30)
+    rows = (
+        PriceBar.objects.filter(interval='1d', symbol__in=symbols, timestamp__gte=since)
+        .values_list('symbol', 'timestamp', 'close')
+    )
+    frame = pd.DataFrame.from_records(list(rows), columns=['symbol', 'timestamp', 'close'])
+    if frame.empty:
+        return pd.DataFrame(columns=list(symbols), dtype='float64')
+    # Semboller farklı saatte damgalanmış olabilir, piyasa gününe göre hizalanır
+    frame['date'] = pd.to_datetime(frame['timestamp'], utc=True).dt.tz_convert(market_timezone()).dt.tz_localize(None).dt.normalize()
+    closes = frame.pivot_table(index='date', columns='symbol', values='close', aggfunc='last')
+    return closes.reindex(columns=list(symbols)).astype('float64')
+
+
+class ReturnStats:
+    """Pairwise-complete sums of daily returns over a rolling window.
+
+    The matrices are kept as running sums (counts, sums, sums of squares and
+    cross products per pair), so appending bars costs O(new rows x N²) and
+    the correlation, covariance and beta figures come out of a few
+    element-wise operations instead of a pass over the whole window. Missing
+    days are excluded pair by pair, like ``DataFrame.corr``.
+    """
+
+    def __init__(self, symbols, window=ANALYTICS_WINDOW, min_periods=ANALYTICS_MIN_PERIODS):
+        self.symbols = list(symbols)
+        self.window = window
+        self.min_periods = min_periods
+        self.revision = 0
+        # Okunmuş en yüksek PriceBar id'si; bundan büyükler sonradan yazılmıştır
+        self.last_id = 0
+        self.closes = pd.DataFrame(columns=self.symbols, index=pd.DatetimeIndex([]), dtype='float64')
+        self.returns = self.closes.copy()
+        shape = (len(self.symbols), len(self.symbols))
+        self.count = np.zeros(shape)
+        self.sum = np.zeros(shape)
+        self.sum_sq = np.zeros(shape)
+        self.cross = np.zeros(shape)
+        self._result = None
+
+    def _accumulate(self, returns, sign):
+        x = returns.to_numpy(dtype='float64')
+        present = ~np.isnan(x)
+        values = np.where(present, x, 0.0)
+        mask = present.astype('float64')
+        # [i, j] = i'nin, j'nin de verisi olan günlerdeki toplamı
+        self.count += sign * (mask.T @ mask)
+        self.sum += sign * (values.T @ mask)
+        self.sum_sq += sign * ((values ** 2).T @ mask)
+        self.cross += sign * (values.T @ values)
+
+    def update(self, closes):
+        """Merge new or revised closes (from their first date on) into the window.
+
+        Returns the number of return rows added.
+        """
+        if closes.empty:
+            return 0
+        closes = closes.reindex(columns=self.symbols)
+        first = closes.index[0]
+        if closes.equals(self.closes.loc[first:]):
+            return 0
+
+        merged = pd.concat([self.closes[self.closes.index < first], closes]).iloc[-(self.window + 1):]
+        returns = merged.pct_change(fill_method=None).iloc[1:]
+        # Değişen ve pencereden çıkan günlerin eski katkısı düşülür, yenileri eklenir
+        kept = self.returns.index.isin(returns.index) & (self.returns.index < first)
+        added = returns[returns.index >= first]
+        self._accumulate(self.returns[~kept], -1)
+        self._accumulate(added, 1)
+
+        self.closes = merged
+        self.returns = returns
+        self.revision += 1
+        self._result = None
+        return len(added)
+
+    def matrices(self):
+        """``(correlation, covariance, variance)`` arrays; ``variance[i, j]`` is i's over the days shared with j."""
+        n = self.count
+        with np.errstate(invalid='ignore', divide='ignore'):
+            covariance = (self.cross - self.sum * self.sum.T / n) / (n - 1)
+            variance = (self.sum_sq - self.sum ** 2 / n) / (n - 1)
+            correlation = covariance / np.sqrt(variance * variance.T)
+        too_short = n < self.min_periods
+        covariance[too_short] = np.nan
+        variance[too_short] = np.nan
+        correlation[too_short] = np.nan
+        return np.clip(correlation, -1, 1), covariance, variance
+
+    def result(self, benchmark):
+        """Correlation/covariance frames and betas against ``benchmark``, cached per revision."""
+        if self._result is None:
+            correlation, covariance, variance = self.matrices()
+            b = self.symbols.index(benchmark)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                betas = covariance[:, b] / variance[b, :]
+            self._result = {
+                'correlation': pd.DataFrame(correlation, index=self.symbols, columns=self.symbols),
+                'covariance': pd.DataFrame(covariance, index=self.symbols, columns=self.symbols),
+                'betas': pd.Series(betas, index=self.symbols).drop(benchmark),
+            }
+        return self._result
+
+
+def written_since(symbols, last_id):
+    """``{"earliest": timestamp, "last_id": id}`` of daily bars written after ``last_id``."""
+    return PriceBar.objects.filter(interval='1d', symbol__in=symbols, id__gt=last_id).aggregate(
+        earliest=Min('timestamp'), last_id=Max('id'),
+    )
+
+
+def return_stats(benchmark=ANALYTICS_BENCHMARK):
+    """Up-to-date ``ReturnStats`` for every company plus ``benchmark``.
+
+    Bars are read from the last stored day on (its close keeps changing until
+    the session ends), or from the earliest bar written since the last read,
+    so a backfilled or re-downloaded history is merged in as well.
+    """
+    symbols = [*registry.symbols(), benchmark]
+    key = tuple(symbols)
+    with _lock:
+        stats = stats_cache.get(key)
+        # id'ler barlardan önce okunur; arada yazılan bar bir sonraki turda görülür
+        written = written_since(symbols, 0 if stats is None else stats.last_id)
+        if stats is None:
+            stats = ReturnStats(symbols)
+            stats.update(daily_closes(symbols))
+            stats_cache.set(key, stats)
+        else:
+            since = None if stats.closes.empty else stats.closes.index[-1].tz_localize(market_timezone())
+            if since is not None and written['earliest'] is not None:
+                since = min(since, written['earliest'])
+            stats.update(daily_closes(symbols, since=since))
+        stats.last_id = written['last_id'] or stats.last_id
+        return stats
+
+
+def sector_aggregates(betas):
+    """Per sector: company count, total market cap, median P/E and median beta."""
+    universe = get_universe()
+    frame = pd.DataFrame({
+        'sector': universe['sector'].fillna('Unknown'),
+        'market_cap': universe[quote_column('market_cap')],
+        'pe_ratio': universe[quote_column('pe_ratio')],
+        'beta': betas.reindex(universe.index),
+    })
+    grouped = frame.groupby('sector')
+    sectors = pd.DataFrame({
+        'companies': grouped.size(),
+        'market_cap': grouped['market_cap'].sum(min_count=1),
+        'median_pe': grouped['pe_ratio'].median(),
+        'median_beta': grouped['beta'].median(),
+    }).sort_values('market_cap', ascending=False)
+    return sectors
+
+
+def _records(frame):
+    return frame.round(6).astype(object).where(frame.notna(), None)
+
+
+def analytics(symbols=None, benchmark=ANALYTICS_BENCHMARK):
+    """Correlation and covariance of daily returns, betas and sector aggregates.
+
+    ``symbols`` narrows the matrices to a subset (in the given order); the
+    numbers themselves always come from the shared, cached statistics.
+    """
+    started = time.perf_counter()
+    # Endeks barları yoksa bir kez indirilir, varsa arka planda güncellenir
+    ensure_history(benchmark, '1d')
+    stats = return_stats(benchmark)
+    result = stats.result(benchmark)
+
+    columns = [symbol for symbol in stats.symbols if symbol != benchmark]
+    if symbols:
+        unknown = [symbol for symbol in symbols if symbol not in columns]
+        if unknown:
+            raise ValueError(f"Unknown symbols: {', '.join(unknown)}")
+        columns = list(symbols)
+
+    sectors = sector_aggregates(result['betas'])
+    return {
+        'benchmark': benchmark,
+        'as_of': stats.closes.index[-1].date().isoformat() if not stats.closes.empty else None,
+        'days': len(stats.returns),
+        'symbols': columns,
+        'correlation': _records(result['correlation'].loc[columns, columns]).values.tolist(),
+        'covariance': _records(result['covariance'].loc[columns, columns]).values.tolist(),
+        'betas': _records(result['betas'].reindex(columns)).to_dict(),
+        'sectors': [
+            {'sector': sector, **row}
+            for sector, row in _records(sectors).to_dict('index').items()
+        ],
+        'took_ms': round((time.perf_counter() - started) * 1000, 1),
+    }
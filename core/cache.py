@@ -0,0 +1,207 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+from django.conf import settings
+
+from .upstream import yahoo
+
+_MISSING = object()
+
+
+class TTLCache:
+    """Thread-safe in-process cache with a TTL and LRU eviction.
+
+    Entries older than ``ttl`` seconds are treated as misses; once ``maxsize``
+    entries are stored the least recently used one is dropped. ``hits``,
+    ``misses`` and ``evictions`` are kept for monitoring.
+    """
+
+    def __init__(self, ttl=300, maxsize=256):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is not _MISSING:
+                expires_at, value = entry
+                if expires_at > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                # Süresi dolan kayıt silinmez; peek() ile yedek olarak okunabilir, LRU ile düşer
+            self.misses += 1
+            return default
+
+    def peek(self, key, default=None):
+        """The stored value for ``key`` even if it has expired; not counted in the stats."""
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            return default if entry is _MISSING else entry[1]
+
+    def set(self, key, value, ttl=None):
+        ttl = self.ttl if ttl is None else ttl
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_set(self, key, loader, ttl=None):
+        """Return the cached value for ``key``, calling ``loader()`` on a miss."""
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = loader()
+            self.set(key, value, ttl)
+        return value
+
+    def invalidate(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def __len__(self):
+        return len(self._data)
+
+
+class SingleFlight:
+    """Coalesces concurrent calls for the same key into one execution.
+
+    The first caller for a key runs the function; everyone arriving while it
+    is in flight waits for and shares its result (or exception). Threads use
+    ``do``, coroutines ``ado``; both see the same in-flight calls.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._tasks = set()
+        self._lock = threading.Lock()
+
+    def _join(self, key):
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                return call, False
+            call = self._calls[key] = Future()
+            return call, True
+
+    def _finish(self, key, call, result=None, error=None):
+        with self._lock:
+            del self._calls[key]
+        if error is not None:
+            call.set_exception(error)
+        else:
+            call.set_result(result)
+
+    def in_flight(self, key):
+        with self._lock:
+            return key in self._calls
+
+    def do(self, key, fn):
+        call, leader = self._join(key)
+        if not leader:
+            return call.result()
+        try:
+            result = fn()
+        except BaseException as e:
+            self._finish(key, call, error=e)
+            raise
+        self._finish(key, call, result)
+        return result
+
+    async def ado(self, key, fn):
+        """Like ``do`` for a coroutine function ``fn``.
+
+        ``fn`` runs in its own task and every caller waits on it through
+        ``asyncio.shield``: a cancelled caller (e.g. a disconnected client)
+        stops waiting, but the call still finishes and releases the key.
+        """
+        call, leader = self._join(key)
+        if leader:
+            task = asyncio.ensure_future(fn())
+            self._tasks.add(task)
+            task.add_done_callback(lambda task: self._settle(key, call, task))
+        return await asyncio.shield(asyncio.wrap_future(call))
+
+    def _settle(self, key, call, task):
+        self._tasks.discard(task)
+        if task.cancelled():
+            self._finish(key, call, error=asyncio.CancelledError())
+        elif task.exception() is not None:
+            self._finish(key, call, error=task.exception())
+        else:
+            self._finish(key, call, task.result())
+
+
+class TickerInfoCache(TTLCache):
+    """Process-wide cache of ``yfinance.Ticker(symbol).info`` dicts."""
+
+    def __init__(self, ttl=300, maxsize=256):
+        super().__init__(ttl, maxsize)
+        self._inflight = SingleFlight()
+
+    def get_info(self, symbol):
+        info = self.get(symbol)
+        if info is None:
+            # Aynı sembol için eşzamanlı istekler tek bir indirmeyi bekler
+            info = self._inflight.do(symbol, lambda: self._load(symbol))
+        return info
+
+    def _load(self, symbol):
+        try:
+            info = yahoo.info(symbol) or {}
+        except Exception:
+            # Upstream erişilemezken süresi dolmuş kayıt boş yanıttan iyidir
+            stale = self.peek(symbol)
+            if stale is None:
+                raise
+            return stale
+        # Boş yanıtlar (ör. rate limit) önbelleğe alınmaz
+        if info:
+            self.set(symbol, info)
+        return info
+
+
+class FigureCache(TTLCache):
+    """Rendered chart HTML keyed by (symbol, chart, dark_mode, data revision).
+
+    A new data revision produces a new key, so stale figures are never served;
+    old revisions simply age out through LRU eviction.
+    """
+
+    def get_or_render(self, symbol, chart, dark_mode, revision, render):
+        return self.get_or_set((symbol, chart, bool(dark_mode), revision), render)
+
+
+ticker_info_cache = TickerInfoCache(
+    ttl=getattr(settings, "TICKER_INFO_CACHE_TTL", 900),
+    maxsize=getattr(settings, "TICKER_INFO_CACHE_SIZE", 256),
+)
+
+figure_cache = FigureCache(
+    ttl=getattr(settings, "FIGURE_CACHE_TTL", 6 * 60 * 60),
+    maxsize=getattr(settings, "FIGURE_CACHE_SIZE", 128),
+)
@@ -0,0 +1,86 @@
+import base64
+
+import numpy as np
+import pandas as pd
+
+# columnar: düz listeler, delta: tamsayı farkları, f32: base64 ile paketlenmiş diziler
+ENCODINGS = ('columnar', 'delta', 'f32')
+
+# delta kodlamasında fiyatlar kuruş cinsinden tamsayıya çevrilir
+PRICE_SCALE = 100
+
+
+def lttb_indices(x, y, threshold):
+    """Row positions picked by Largest-Triangle-Three-Buckets.
+
+    Keeps the first and last points and, from each of ``threshold - 2``
+    equal buckets in between, the point forming the largest triangle with
+    the previously kept point and the next bucket's average. Peaks and
+    troughs survive, so the line keeps its shape.
+    """
+    n = len(x)
+    if threshold < 3 or threshold >= n:
+        return np.arange(n)
+
+    every = (n - 2) / (threshold - 2)
+    bounds = (np.floor(np.arange(threshold - 1) * every) + 1).astype('int64')
+    bounds[-1] = n - 1
+    indices = np.empty(threshold, dtype='int64')
+    indices[0], indices[-1] = 0, n - 1
+
+    a = 0
+    for i in range(threshold - 2):
+        start, end = bounds[i], bounds[i + 1]
+        next_end = bounds[i + 2] if i + 2 < len(bounds) else n
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+        # Üçgen alanının iki katı; sabit çarpan seçimi değiştirmez
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(area.argmax())
+        indices[i + 1] = a
+    return indices
+
+
+def downsample(hist_df, max_points):
+    """Reduce a history frame to at most ``max_points`` rows with LTTB on the close."""
+    if not max_points or len(hist_df) <= max_points:
+        return hist_df
+    x = (hist_df['Date'] - pd.Timestamp(0, tz='UTC')).dt.total_seconds().to_numpy(dtype='float64')
+    y = hist_df['Close'].to_numpy(dtype='float64')
+    return hist_df.iloc[lttb_indices(x, y, max_points)].reset_index(drop=True)
+
+
+def _pack(array, dtype):
+    return base64.b64encode(np.ascontiguousarray(array, dtype=dtype).tobytes()).decode('ascii')
+
+
+def encode_series(hist_df, encoding='delta'):
+    """Turn a history frame into a compact, columnar close-price payload.
+
+    Timestamps are epoch seconds; ``tz_offset`` is the market's UTC offset in
+    seconds so the client can show exchange-local times. Theme and layout are
+    left to the client.
+    """
+    if encoding not in ENCODINGS:
+        raise ValueError(f"Unknown encoding: {encoding}")
+
+    dates = hist_df['Date']
+    times = ((dates - pd.Timestamp(0, tz='UTC')) // pd.Timedelta(seconds=1)).to_numpy(dtype='int64')
+    closes = hist_df['Close'].to_numpy(dtype='float64')
+    tz_offset = int(dates.iloc[-1].utcoffset().total_seconds()) if len(dates) else 0
+
+    payload = {'encoding': encoding, 'count': len(closes), 'tz_offset': tz_offset}
+
+    if encoding == 'columnar':
+        payload['t'] = times.tolist()
+        payload['c'] = np.round(closes, 2).tolist()
+    elif encoding == 'delta':
+        cents = np.round(closes * PRICE_SCALE).astype('int64')
+        payload['scale'] = PRICE_SCALE
+        payload['t'] = np.diff(times, prepend=0).tolist()
+        payload['c'] = np.diff(cents, prepend=0).tolist()
+    else:
+        payload['t'] = _pack(times, '<u4')
+        payload['c'] = _pack(closes, '<f4')
+
+    return payload
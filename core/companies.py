@@ -0,0 +1,71 @@
+from django.conf import settings
+
+from .cache import TTLCache
+from .models import Company
+
+SECTIONS = ('cash_flow', 'income_statement', 'balance_sheet', 'profitability')
+
+# symbol -> {"name": ..., "<section>": <decoded JSON>, ...}
+# Her sembol için yalnızca şimdiye kadar istenmiş bölümler tutulur.
+company_cache = TTLCache(
+    ttl=getattr(settings, 'COMPANY_CACHE_TTL', 3600),
+    maxsize=getattr(settings, 'COMPANY_CACHE_SIZE', 1024),
+)
+
+
+def _load(symbols, fields):
+    rows = Company.objects.filter(symbol__in=symbols).values('symbol', *fields)
+    return {row.pop('symbol'): row for row in rows}
+
+
+def get_companies_data(symbols, sections=()):
+    """Company rows for many symbols in one query, as ``{symbol: {...}}``.
+
+    Only ``name``, ``content_hash`` and the requested statement ``sections``
+    are loaded; sections already cached for a symbol are not read again.
+    The content hashes are checked against the database on every call, so
+    an import in another process is picked up at once. Unknown symbols are
+    left out of the result.
+    """
+    # Küçük bir sorgu: önbellekteki kayıt başka bir süreçte değişmiş olabilir
+    current = dict(Company.objects.filter(symbol__in=symbols).values_list('symbol', 'content_hash'))
+
+    result = {}
+    missing = {}
+    for symbol in symbols:
+        if symbol not in current:
+            continue
+        cached = company_cache.get(symbol)
+        if cached is not None and cached['content_hash'] != current[symbol]:
+            company_cache.invalidate(symbol)
+            cached = None
+        needed = [field for field in ('name', *sections) if cached is None or field not in cached]
+        if needed:
+            missing.setdefault(tuple(needed), []).append(symbol)
+        else:
+            result[symbol] = cached
+
+    # Aynı eksik bölümlere sahip semboller tek sorguda okunur
+    for fields, group in missing.items():
+        for symbol, row in _load(group, ('content_hash', *fields)).items():
+            cached = company_cache.get(symbol) or {}
+            if cached.get('content_hash') != row['content_hash']:
+                cached = {}
+            row = {**cached, **row}
+            company_cache.set(symbol, row)
+            result[symbol] = row
+
+    return {symbol: result[symbol] for symbol in symbols if symbol in result}
+
+
+def get_company_data(symbol, sections=SECTIONS):
+    """One company's name, content hash and statement sections, or None if it isn't loaded."""
+    return get_companies_data([symbol], sections).get(symbol)
+
+
+def invalidate_company(symbol=None):
+    """Drop cached company data for ``symbol``, or for every company."""
+    if symbol is None:
+        company_cache.clear()
+    else:
+        company_cache.invalidate(symbol)
@@ -0,0 +1,128 @@
+import math
+
+from django.db.models import Avg, F, Q
+
+from .models import Company, CompanyProfile
+
+# API alan adı -> model yolu; sıralama ve aralık filtreleri yalnızca bu alanlarla yapılır
+COLUMNS = {
+    'symbol': 'symbol',
+    'name': 'name',
+    'market_cap': 'quote__market_cap',
+    'pe_ratio': 'quote__pe_ratio',
+    'volume': 'quote__volume',
+    'current_price': 'quote__current_price',
+    'high_52w': 'quote__high_52w',
+    'low_52w': 'quote__low_52w',
+    'sector': 'profile__sector',
+}
+
+RANGE_FIELDS = ('market_cap', 'pe_ratio', 'volume', 'current_price')
+
+DEFAULT_SORT = ('symbol',)
+DEFAULT_PAGE_SIZE = 10
+MAX_PAGE_SIZE = 500
+
+
+def number_param(params, key):
+    raw = params.get(key)
+    if raw in (None, ''):
+        return None
+    try:
+        value = float(raw)
+    except ValueError:
+        raise ValueError(f"Invalid number for {key}: {raw}")
+    if not math.isfinite(value):
+        raise ValueError(f"Invalid number for {key}: {raw}")
+    return value
+
+
+def int_param(params, key, default, minimum=1, maximum=None):
+    raw = params.get(key)
+    if raw in (None, ''):
+        return default
+    try:
+        value = int(raw)
+    except ValueError:
+        raise ValueError(f"Invalid integer for {key}: {raw}")
+    value = max(value, minimum)
+    return min(value, maximum) if maximum is not None else value
+
+
+def parse_sort(raw):
+    """``"-market_cap,symbol"`` -> ordering expressions, NULLs always last."""
+    fields = [field.strip() for field in (raw or '').split(',') if field.strip()] or list(DEFAULT_SORT)
+    ordering = []
+    for field in fields:
+        name = field.lstrip('-')
+        if name not in COLUMNS:
+            raise ValueError(f"Unknown sort field: {name}")
+        expression = F(COLUMNS[name])
+        ordering.append(expression.desc(nulls_last=True) if field.startswith('-') else expression.asc(nulls_last=True))
+    # Sayfalar arası kararlı sıra için sembol her zaman son anahtardır
+    if 'symbol' not in {field.lstrip('-') for field in fields}:
+        ordering.append(F('symbol').asc())
+    return ordering
+
+
+def filter_companies(params):
+    """Companies matching the search, sector and ``min_``/``max_`` range filters in ``params``."""
+    companies = Company.objects.all()
+
+    query = (params.get('q') or '').strip()
+    if query:
+        companies = companies.filter(Q(symbol__istartswith=query) | Q(name__icontains=query))
+
+    sector = params.get('sector')
+    if sector:
+        companies = companies.filter(profile__sector=sector)
+
+    for field in RANGE_FIELDS:
+        lookup = COLUMNS[field]
+        low, high = number_param(params, f'min_{field}'), number_param(params, f'max_{field}')
+        if low is not None:
+            companies = companies.filter(**{f'{lookup}__gte': low})
+        if high is not None:
+            companies = companies.filter(**{f'{lookup}__lte': high})
+
+    return companies
+
+
+def sectors():
+    return list(
+        CompanyProfile.objects.exclude(sector__isnull=True).exclude(sector='')
+        .order_by('sector').values_list('sector', flat=True).distinct()
+    )
+
+
+def query_table(params):
+    """One page of the companies table plus counts and summary stats, as a JSON-ready dict.
+
+    Raises ``ValueError`` for malformed parameters.
+    """
+    page = int_param(params, 'page', 1)
+    page_size = int_param(params, 'page_size', DEFAULT_PAGE_SIZE, maximum=MAX_PAGE_SIZE)
+    ordering = parse_sort(params.get('sort'))
+
+    companies = filter_companies(params)
+    filtered = companies.count()
+    pages = max(math.ceil(filtered / page_size), 1)
+    page = min(page, pages)
+    offset = (page - 1) * page_size
+
+    # JSON blob sütunları okunmaz; yalnızca tablo alanları seçilir
+    plain = [name for name, path in COLUMNS.items() if name == path]
+    related = {name: F(path) for name, path in COLUMNS.items() if name != path}
+    rows = list(companies.order_by(*ordering).values(*plain, **related)[offset:offset + page_size])
+    summary = companies.aggregate(avg_market_cap=Avg('quote__market_cap'), avg_pe_ratio=Avg('quote__pe_ratio'))
+
+    return {
+        'results': rows,
+        'page': page,
+        'page_size': page_size,
+        'pages': pages,
+        'total': Company.objects.count(),
+        'filtered': filtered,
+        'sectors': sectors(),
+        'stats': summary,
+    }
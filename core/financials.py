@@ -0,0 +1,106 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+from django.db import transaction
+
+from .models import FinancialFact
+
+STATEMENTS = [key for key, _ in FinancialFact.STATEMENTS]
+
+
+def parse_period(key):
+    """Blob period key -> period end date. "2023-12-31" and "2023" are periods, "Change" is not."""
+    try:
+        if len(key) == 4:
+            return date(int(key), 12, 31)
+        return date.fromisoformat(key)
+    except ValueError:
+        return None
+
+
+def parse_value(value):
+    # Eksik değerler CSV'de "--" olarak geliyor, bazı sayılar string
+    if isinstance(value, bool):
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def iter_facts(statement, blob):
+    """Yield ``(period_end, item_code, value)`` for every numeric cell in a statement blob."""
+    for period_key, items in (blob or {}).items():
+        period_end = parse_period(period_key)
+        if period_end is None or not isinstance(items, dict):
+            continue
+        for item_code, raw in items.items():
+            if item_code == 'date':
+                continue
+            value = parse_value(raw)
+            if value is not None:
+                yield period_end, item_code, value
+
+
+def company_facts(company):
+    """FinancialFact objects for all statements of a Company instance (unsaved)."""
+    return [
+        FinancialFact(company=company, statement=statement, period_end=period_end, item_code=item_code, value=value)
+        for statement in STATEMENTS
+        for period_end, item_code, value in iter_facts(statement, getattr(company, statement))
+    ]
+
+
+def sync_facts(companies):
+    """Rebuild the FinancialFact rows of ``companies`` from their JSON blobs."""
+    companies = list(companies)
+    with transaction.atomic():
+        FinancialFact.objects.filter(company__in=companies).delete()
+        facts = [fact for company in companies for fact in company_facts(company)]
+        FinancialFact.objects.bulk_create(facts, batch_size=1000)
+    return len(facts)
+
+
+def facts_frame(symbols, statement, item_codes):
+    """Pivot stored facts into a frame indexed by (symbol, period_end), one column per item."""
+    rows = FinancialFact.objects.filter(
+        company_id__in=symbols, statement=statement, item_code__in=item_codes,
+    ).values_list('company_id', 'period_end', 'item_code', 'value')
+
+    frame = pd.DataFrame.from_records(list(rows), columns=['symbol', 'period_end', 'item_code', 'value'])
+    frame = frame.pivot_table(index=['symbol', 'period_end'], columns='item_code', values='value', aggfunc='last')
+    # İstenen sırayı koru, hiç verisi olmayan kalemleri at
+    return frame.reindex(columns=[code for code in item_codes if code in frame.columns]).sort_index()
+
+
+def period_changes(frame, periods=1):
+    """Percent change between consecutive periods of each symbol, for every column at once.
+
+    Periods are taken in date order per symbol, so annual, quarterly and
+    non-December fiscal year-ends all work; use ``periods=4`` for
+    year-over-year on quarterly data. The first ``periods`` rows of each
+    symbol and changes from a zero base come back as NaN.
+    """
+    if frame.empty:
+        return frame
+    changes = frame.groupby(level='symbol').pct_change(periods=periods, fill_method=None) * 100
+    return changes.replace([np.inf, -np.inf], np.nan).groupby(level='symbol').tail(-periods)
+
+
+def period_label(period_end):
+    """'2023' for December year-ends, '2023-06' otherwise."""
+    return str(period_end.year) if period_end.month == 12 and period_end.day == 31 else period_end.strftime('%Y-%m')
+
+
+NET_DEBT_ITEMS = {
+    'FD': 'Financial Debt',
+    'CE': 'Cash And Cash Equivalents',
+    'OSTI': 'Other Short Term Investments',
+}
+
+
+def net_debt_changes(symbols):
+    """Period-over-period % change of net debt components for many symbols in one pass."""
+    frame = facts_frame(symbols, 'balance_sheet', list(NET_DEBT_ITEMS))
+    return period_changes(frame).rename(columns=NET_DEBT_ITEMS)
@@ -0,0 +1,41 @@
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+
+# Şablon parçalarının ({% cache %}) önbellekte kalma süresi (saniye)
+FRAGMENT_CACHE_TTL = getattr(settings, 'FRAGMENT_CACHE_TTL', 15 * 60)
+
+# Tüm sayfalar için ortak nesil; refresh_market_data bunu yeniler
+GENERATION_KEY = 'fragments:generation'
+
+
+def _symbol_key(symbol):
+    return f'{GENERATION_KEY}:{symbol}'
+
+
+def _generation(key):
+    # Yoksa yeni nesil üretilir; get_or_set add() kullandığından yarışan
+    # worker'lar aynı değeri görür
+    return cache.get_or_set(key, lambda: uuid.uuid4().hex[:12], timeout=None)
+
+
+def revision(symbol=None, *parts):
+    """Revision string for ``{% cache %}`` keys of a page, or of one symbol's sections.
+
+    It combines the global and per-symbol generations with ``parts`` (e.g.
+    the company's content hash), so either ``invalidate`` or a data change
+    makes the old fragments unreachable; they then expire from the cache.
+    """
+    generations = [_generation(GENERATION_KEY)]
+    if symbol is not None:
+        generations.append(_generation(_symbol_key(symbol)))
+    return ':'.join(str(part) for part in (*generations, *parts) if part)
+
+
+def invalidate(symbols=None):
+    """Retire cached fragments for ``symbols``, or for every page."""
+    if symbols is None:
+        cache.delete(GENERATION_KEY)
+    else:
+        cache.delete_many([_symbol_key(symbol) for symbol in symbols])
@@ -0,0 +1,287 @@
+import asyncio
+import logging
+import threading
+from datetime import timedelta
+from zoneinfo import ZoneInfo
+
+import pandas as pd
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .cache import SingleFlight, TTLCache
+from .models import PriceBar
+from .upstream import UpstreamUnavailable, yahoo
+
+logger = logging.getLogger(__name__)
+
+# Grafik periyotları -> yfinance periyot/aralık eşlemesi.
+# max_age: yanıtın tarayıcı/proxy önbelleğinde taze sayılacağı süre (saniye)
+PERIODS = {
+    '1d': {'period': '1d', 'interval': '1m', 'max_age': 60},
+    '1w': {'period': '5d', 'interval': '15m', 'max_age': 5 * 60},
+    '1m': {'period': '1mo', 'interval': '1d', 'max_age': 15 * 60},
+    '1y': {'period': '1y', 'interval': '1d', 'max_age': 60 * 60},
+    'all': {'period': '5y', 'interval': '1d', 'max_age': 6 * 60 * 60},  # 5 years of data
+}
+
+# Yerel veri yokken yapılan ilk indirme. yfinance 1m barları yalnızca son
+# 7 gün, 15m barları son 60 gün için veriyor.
+BACKFILL = {
+    '1m': {'period': '5d'},
+    '15m': {'period': '1mo'},
+    '1d': {'start': '2020-01-01'},
+}
+
+# Bu kadar eski intraday barlar silinir, tablo sınırsız büyümez
+RETENTION = {
+    '1m': timedelta(days=7),
+    '15m': timedelta(days=60),
+}
+
+# Bir sembol/aralık en fazla bu sıklıkla upstream'den güncellenir (saniye)
+FRESHNESS = {
+    '1m': 60,
+    '15m': 15 * 60,
+    '1d': 60 * 60,
+}
+
+# Bir barın kapsadığı süre; bar bu süre dolunca kapanmış sayılır
+BAR_LENGTH = {
+    '1m': timedelta(minutes=1),
+    '15m': timedelta(minutes=15),
+    '1d': timedelta(days=1),
+}
+
+COLUMNS = ['Date', 'Open', 'High', 'Low', 'Close', 'Volume']
+
+# history(actions=True) sütunları; biri yeni barlarda sıfırdan farklıysa
+# Yahoo önceki kapanışları yeniden düzeltmiştir
+ACTIONS = ['Dividends', 'Stock Splits']
+
+_synced = TTLCache(ttl=60, maxsize=4096)
+# (symbol, interval) başına aynı anda en fazla bir upstream indirmesi
+_inflight = SingleFlight()
+
+
+def market_timezone():
+    return getattr(settings, 'MARKET_TIME_ZONE', 'Europe/Istanbul')
+
+
+def last_timestamp(symbol, interval):
+    return (
+        PriceBar.objects.filter(symbol=symbol, interval=interval)
+        .order_by('-timestamp')
+        .values_list('timestamp', flat=True)
+        .first()
+    )
+
+
+def last_bar(symbol, interval):
+    """``(timestamp, close, volume)`` of the newest stored bar, or None."""
+    return (
+        PriceBar.objects.filter(symbol=symbol, interval=interval)
+        .order_by('-timestamp')
+        .values_list('timestamp', 'close', 'volume')
+        .first()
+    )
+
+
+def has_new_actions(frame, since):
+    """Whether ``frame`` has a dividend or split after ``since``."""
+    if frame is None or frame.empty:
+        return False
+    newer = frame[frame.index > since]
+    return any(column in newer and newer[column].fillna(0).ne(0).any() for column in ACTIONS)
+
+
+def fetch_bars(symbol, interval, since=None):
+    """Download bars from yfinance, starting at ``since`` (inclusive day) if given.
+
+    Returns ``(frame, full)``. ``full`` is True when the whole backfill was
+    downloaded, either because nothing usable is stored or because a split or
+    dividend moved the adjustment basis; the frame then replaces the stored bars.
+    """
+    if since is not None and timezone.now() - since < RETENTION.get(interval, timedelta.max):
+        # Son barın gününden başla ki gün içinde değişen son bar da güncellensin
+        start = since.astimezone(ZoneInfo(market_timezone())).date()
+        frame = yahoo.history(symbol, start=start, interval=interval, actions=True)
+        if not has_new_actions(frame, since):
+            return frame, False
+        # Bölünme, bedelsiz ya da temettüden sonra Yahoo geçmiş fiyatları yeniden
+        # düzeltir; saklı barlar eski bazda kalmasın diye geçmiş baştan indirilir
+        logger.info("Corporate action for %s (%s), downloading full history", symbol, interval)
+    return yahoo.history(symbol, interval=interval, actions=True, **BACKFILL[interval]), True
+
+
+def store_bars(symbol, interval, frame):
+    """Upsert a yfinance history frame into PriceBar. Returns the number of rows written."""
+    if frame is None or frame.empty:
+        return 0
+
+    bars = [
+        PriceBar(
+            symbol=symbol,
+            interval=interval,
+            timestamp=timestamp.to_pydatetime(),
+            open=row.Open,
+            high=row.High,
+            low=row.Low,
+            close=row.Close,
+            volume=int(row.Volume) if pd.notna(row.Volume) else None,
+        )
+        for timestamp, row in zip(frame.index, frame.itertuples(index=False))
+        if pd.notna(row.Close)
+    ]
+    PriceBar.objects.bulk_create(
+        bars,
+        update_conflicts=True,
+        unique_fields=['symbol', 'interval', 'timestamp'],
+        update_fields=['open', 'high', 'low', 'close', 'volume'],
+    )
+    return len(bars)
+
+
+def sync_history(symbol, interval='1d'):
+    """Append bars newer than the last stored one and prune expired intraday bars."""
+    since = last_timestamp(symbol, interval)
+    return save_history(symbol, interval, *fetch_bars(symbol, interval, since))
+
+
+def save_history(symbol, interval, frame, full=False):
+    """Store freshly fetched bars, prune expired intraday bars and mark the symbol synced if any were written.
+
+    With ``full`` the frame is a complete backfill and replaces the stored bars.
+    """
+    with transaction.atomic():
+        if full and frame is not None and not frame.empty:
+            PriceBar.objects.filter(symbol=symbol, interval=interval).delete()
+        written = store_bars(symbol, interval, frame)
+
+    if interval in RETENTION:
+        PriceBar.objects.filter(
+            symbol=symbol, interval=interval, timestamp__lt=timezone.now() - RETENTION[interval]
+        ).delete()
+
+    # Boş yanıt (upstream sorunu ya da henüz veri yok) senkron sayılmaz,
+    # sıradaki istek yeniden dener
+    if written:
+        _synced.set((symbol, interval), True, ttl=FRESHNESS.get(interval, 60))
+    return written
+
+
+def _sync_logged(symbol, interval):
+    try:
+        return sync_history(symbol, interval)
+    except UpstreamUnavailable as e:
+        logger.warning("History sync skipped for %s (%s): %s", symbol, interval, e)
+    except Exception:
+        logger.exception("History sync failed for %s (%s)", symbol, interval)
+
+
+async def _async_sync_logged(symbol, interval, since):
+    try:
+        frame, full = await asyncio.to_thread(fetch_bars, symbol, interval, since)
+        return await sync_to_async(save_history)(symbol, interval, frame, full)
+    except UpstreamUnavailable as e:
+        logger.warning("History sync skipped for %s (%s): %s", symbol, interval, e)
+    except Exception:
+        logger.exception("History sync failed for %s (%s)", symbol, interval)
+
+
+def revalidate_history(symbol, interval='1d'):
+    """Sync ``symbol`` in a background thread unless a sync is already in flight."""
+    key = (symbol, interval)
+    if _inflight.in_flight(key):
+        return
+
+    def run():
+        try:
+            _inflight.do(key, lambda: _sync_logged(symbol, interval))
+        finally:
+            # Bu thread'in açtığı veritabanı bağlantısı kapatılır
+            connection.close()
+
+    threading.Thread(target=run, name=f"history-{symbol}-{interval}", daemon=True).start()
+
+
+def ensure_history(symbol, interval='1d'):
+    """Sync ``symbol`` unless it was synced within its freshness window.
+
+    When bars are already stored they are served as-is while a background
+    sync brings them up to date (stale-while-revalidate). Only a symbol with
+    no local bars waits for the download, and concurrent waiters share a
+    single one. Upstream errors are logged, never raised.
+    """
+    if _synced.get((symbol, interval)):
+        return
+    if last_timestamp(symbol, interval) is not None:
+        revalidate_history(symbol, interval)
+        return
+    _inflight.do((symbol, interval), lambda: _sync_logged(symbol, interval))
+
+
+async def aensure_history(symbol, interval='1d'):
+    """Async ``ensure_history``.
+
+    The upstream download runs in a worker thread so the event loop can keep
+    other requests' downloads in flight; database work goes through
+    ``sync_to_async`` as usual.
+    """
+    if _synced.get((symbol, interval)):
+        return
+    since = await sync_to_async(last_timestamp)(symbol, interval)
+    if since is not None:
+        revalidate_history(symbol, interval)
+        return
+    await _inflight.ado((symbol, interval), lambda: _async_sync_logged(symbol, interval, since))
+
+
+def load_history(symbol, interval='1d', start=None, end=None):
+    """Read stored bars as a DataFrame with ``COLUMNS``, dates in the market time zone."""
+    bars = PriceBar.objects.filter(symbol=symbol, interval=interval)
+    if start is not None:
+        bars = bars.filter(timestamp__gte=start)
+    if end is not None:
+        bars = bars.filter(timestamp__lt=end)
+
+    rows = bars.order_by('timestamp').values_list('timestamp', 'open', 'high', 'low', 'close', 'volume')
+    frame = pd.DataFrame.from_records(list(rows), columns=COLUMNS)
+    frame['Date'] = pd.to_datetime(frame['Date'], utc=True).dt.tz_convert(market_timezone())
+    return frame
+
+
+async def aget_history(symbol, interval='1d', start=None, end=None):
+    await aensure_history(symbol, interval)
+    return await sync_to_async(load_history)(symbol, interval, start, end)
+
+
+def slice_period(frame, period):
+    """Cut a history frame down to one of the ``PERIODS`` windows, like yfinance would."""
+    if frame.empty:
+        return frame
+
+    dates = frame['Date']
+    if period in ('1d', '1w'):
+        # İşlem günü bazında: son 1 ya da son 5 seans
+        sessions = dates.dt.normalize().drop_duplicates()
+        first_session = sessions.iloc[-(1 if period == '1d' else 5):].iloc[0]
+        mask = dates >= first_session
+    else:
+        offsets = {'1m': pd.DateOffset(months=1), '1y': pd.DateOffset(years=1), 'all': pd.DateOffset(years=5)}
+        mask = dates > dates.iloc[-1] - offsets[period]
+    return frame[mask].reset_index(drop=True)
+
+
+def load_period(symbol, period):
+    """Read one chart period from the local store, without syncing."""
+    interval = PERIODS[period]['interval']
+    if period in ('1d', '1w'):
+        start = None  # intraday tablosu zaten RETENTION ile sınırlı
+    else:
+        last = last_timestamp(symbol, interval)
+        if last is None:
+            return load_history(symbol, interval)
+        start = last - timedelta(days={'1m': 32, '1y': 367, 'all': 5 * 366}[period])
+    return slice_period(load_history(symbol, interval, start), period)
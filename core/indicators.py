@@ -0,0 +1,209 @@
+import numpy as np
+import pandas as pd
+from django.conf import settings
+
+from .cache import TTLCache
+from .history import load_history
+
+# Yıllıklandırma ve 52 haftalık pencere için bir yıldaki bar sayısı
+# (BIST seansı günde yaklaşık 8 saat)
+BARS_PER_YEAR = {'1d': 252, '15m': 252 * 32, '1m': 252 * 480}
+
+MAX_INDICATORS = 8
+MAX_WINDOW = 500
+
+# (symbol, interval, name, args) -> Date indeksli gösterge tablosu. Yeni bar
+# gelince yalnızca kuyruk yeniden hesaplanır; '_' ile başlayan sütunlar
+# özyinelemeli göstergelerin kaldığı yerden devam etmesi için tutulan durumdur.
+indicator_cache = TTLCache(
+    ttl=getattr(settings, 'INDICATOR_CACHE_TTL', 6 * 60 * 60),
+    maxsize=getattr(settings, 'INDICATOR_CACHE_SIZE', 512),
+)
+
+
+def _smooth(values, alpha, seed=None):
+    """Exponential smoothing (``adjust=False``), continuing from ``seed`` when given."""
+    if seed is None or pd.isna(seed):
+        return values.ewm(alpha=alpha, adjust=False).mean()
+    extended = pd.concat([pd.Series([seed]), values], ignore_index=True)
+    return pd.Series(extended.ewm(alpha=alpha, adjust=False).mean().to_numpy()[1:], index=values.index)
+
+
+def _seed(seed, column):
+    return None if seed is None else seed[column]
+
+
+def _previous_close(close, seed):
+    previous = close.shift(1)
+    if seed is not None:
+        previous.iloc[0] = seed['_close']
+    return previous
+
+
+def sma(frame, seed, interval, window):
+    return pd.DataFrame({'sma': frame['Close'].rolling(window).mean()})
+
+
+def ema(frame, seed, interval, span):
+    return pd.DataFrame({'ema': _smooth(frame['Close'], 2 / (span + 1), _seed(seed, 'ema'))})
+
+
+def rsi(frame, seed, interval, period):
+    # Wilder yumuşatması: alpha = 1 / period
+    delta = frame['Close'] - _previous_close(frame['Close'], seed)
+    gain = _smooth(delta.clip(lower=0), 1 / period, _seed(seed, '_gain'))
+    loss = _smooth((-delta).clip(lower=0), 1 / period, _seed(seed, '_loss'))
+    return pd.DataFrame({'rsi': 100 - 100 / (1 + gain / loss), '_gain': gain, '_loss': loss})
+
+
+def macd(frame, seed, interval, fast, slow, signal):
+    fast_ema = _smooth(frame['Close'], 2 / (fast + 1), _seed(seed, '_fast'))
+    slow_ema = _smooth(frame['Close'], 2 / (slow + 1), _seed(seed, '_slow'))
+    line = fast_ema - slow_ema
+    signal_line = _smooth(line, 2 / (signal + 1), _seed(seed, 'signal'))
+    return pd.DataFrame({
+        'macd': line, 'signal': signal_line, 'hist': line - signal_line,
+        '_fast': fast_ema, '_slow': slow_ema,
+    })
+
+
+def bbands(frame, seed, interval, window, width):
+    rolling = frame['Close'].rolling(window)
+    middle = rolling.mean()
+    band = rolling.std(ddof=0) * width
+    return pd.DataFrame({'middle': middle, 'upper': middle + band, 'lower': middle - band})
+
+
+def volatility(frame, seed, interval, window):
+    """Annualized standard deviation of log returns over ``window`` bars, in percent."""
+    returns = np.log(frame['Close'] / _previous_close(frame['Close'], seed))
+    return pd.DataFrame({'volatility': returns.rolling(window).std() * np.sqrt(BARS_PER_YEAR[interval]) * 100})
+
+
+def drawdown(frame, seed, interval):
+    """Percent below the running peak close."""
+    peak = frame['Close'].cummax()
+    if seed is not None:
+        peak = np.maximum(peak, seed['_peak'])
+    return pd.DataFrame({'drawdown': (frame['Close'] / peak - 1) * 100, '_peak': peak})
+
+
+def range_52w(frame, seed, interval):
+    window = BARS_PER_YEAR[interval]
+    return pd.DataFrame({
+        'high': frame['High'].rolling(window, min_periods=1).max(),
+        'low': frame['Low'].rolling(window, min_periods=1).min(),
+    })
+
+
+# compute: fonksiyon, defaults: varsayılan parametreler,
+# lookback: kuyruk hesaplanırken gereken önceki bar sayısı
+INDICATORS = {
+    'sma': {'compute': sma, 'defaults': (20,), 'lookback': lambda interval, window: window - 1},
+    'ema': {'compute': ema, 'defaults': (20,), 'lookback': lambda interval, span: 0},
+    'rsi': {'compute': rsi, 'defaults': (14,), 'lookback': lambda interval, period: 0},
+    'macd': {'compute': macd, 'defaults': (12, 26, 9), 'lookback': lambda interval, *spans: 0},
+    'bbands': {'compute': bbands, 'defaults': (20, 2.0), 'lookback': lambda interval, window, width: window - 1},
+    'volatility': {'compute': volatility, 'defaults': (20,), 'lookback': lambda interval, window: window},
+    'drawdown': {'compute': drawdown, 'defaults': (), 'lookback': lambda interval: 0},
+    'range_52w': {'compute': range_52w, 'defaults': (), 'lookback': lambda interval: BARS_PER_YEAR[interval] - 1},
+}
+
+
+def parse_indicators(raw):
+    """``"sma:50,rsi,bbands:20:2.5"`` -> ``[("sma", (50,)), ("rsi", (14,)), ...]``."""
+    specs = []
+    for token in filter(None, (part.strip() for part in raw.split(','))):
+        name, *args = token.split(':')
+        if name not in INDICATORS:
+            raise ValueError(f"Unknown indicator: {name}")
+        defaults = INDICATORS[name]['defaults']
+        if len(args) > len(defaults):
+            raise ValueError(f"Too many parameters for {name}")
+        values = [type(default)(arg) for default, arg in zip(defaults, args)]
+        values += defaults[len(values):]
+        if any(not 0 < value <= MAX_WINDOW for value in values):
+            raise ValueError(f"Parameters of {name} must be between 1 and {MAX_WINDOW}")
+        spec = (name, tuple(values))
+        if spec not in specs:
+            specs.append(spec)
+    if len(specs) > MAX_INDICATORS:
+        raise ValueError(f"At most {MAX_INDICATORS} indicators")
+    return specs
+
+
+def label(spec):
+    name, args = spec
+    return ':'.join([name, *map(str, args)])
+
+
+def _resume_at(cached, frame):
+    """Position in ``frame`` from which ``cached`` must be recomputed, or 0."""
+    if cached is None or cached.empty:
+        return 0
+    dates = frame['Date']
+    position = int(dates.searchsorted(cached.index[-1]))
+    if position >= len(frame) or dates.iloc[position] != cached.index[-1]:
+        return 0
+    # Önceki barlardan biri değişmiş ya da araya bar eklenmişse (düzeltilmiş
+    # geçmiş, sonradan doldurulan günler) tablo baştan hesaplanır
+    previous = cached['_close'].reindex(dates.iloc[:position]).to_numpy()
+    if not np.array_equal(previous, frame['Close'].iloc[:position].to_numpy()):
+        return 0
+    # Gün içindeki son bar güncellenmişse o bar da yeniden hesaplanır
+    if frame['Close'].iloc[position] != cached['_close'].iloc[-1]:
+        return position
+    return position + 1
+
+
+def compute(frame, spec, interval, symbol=None):
+    """Indicator table for a ``load_history`` frame, indexed by ``Date``.
+
+    With a ``symbol`` the table is cached, and later calls only compute the
+    bars added (or changed) since, seeding recursive indicators from the last
+    cached row and giving rolling ones just the lookback they need.
+    """
+    name, args = spec
+    definition = INDICATORS[name]
+    key = (symbol, interval, name, args)
+    cached = indicator_cache.get(key) if symbol is not None else None
+
+    start = _resume_at(cached, frame)
+    dates = frame['Date']
+    if start and start == len(frame):
+        return cached.loc[dates.iloc[0]:]
+
+    seed = None
+    warm = 0
+    if start:
+        seed = cached.loc[dates.iloc[start - 1]]
+        warm = max(0, start - definition['lookback'](interval, *args))
+
+    window = frame.iloc[warm:].reset_index(drop=True)
+    result = definition['compute'](window, seed, interval, *args).iloc[start - warm:]
+    result.index = pd.DatetimeIndex(dates.iloc[start:], name='Date')
+    result['_close'] = frame['Close'].iloc[start:].to_numpy()
+
+    if start:
+        result = pd.concat([cached.loc[dates.iloc[0]:dates.iloc[start - 1]], result])
+    if symbol is not None:
+        indicator_cache.set(key, result)
+    return result
+
+
+def symbol_indicators(symbol, interval, specs):
+    """``{label: table}`` for ``specs`` over every stored bar of ``symbol``."""
+    frame = load_history(symbol, interval)
+    if frame.empty:
+        return {}
+    return {label(spec): compute(frame, spec, interval, symbol) for spec in specs}
+
+
+def serialize(table, dates):
+    """Public columns of an indicator table at ``dates``, as JSON-ready lists."""
+    table = table.reindex(pd.DatetimeIndex(dates))
+    return {
+        column: table[column].round(4).astype(object).where(table[column].notna(), None).tolist()
+        for column in table.columns
+        if not column.startswith('_')
+    }
@@ -0,0 +1,22 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core import screener
+from core.ratios import refresh_metrics
+
+
+class Command(BaseCommand):
+    help = 'Recompute derived financial ratios for companies whose statements changed'
+
+    def add_arguments(self, parser):
+        parser.add_argument('symbols', nargs='*', help='Symbols to recompute (default: every company)')
+        parser.add_argument('--force', action='store_true',
+                            help='Recompute even if the statements did not change')
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        written = refresh_metrics(options['symbols'] or None, force=options['force'])
+        screener.invalidate()
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(f'{written} oran {elapsed:.2f} saniyede yazıldı.'))
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from core.models import Company, IndexMembership
+from core.registry import INDICES, registry
+
+
+class Command(BaseCommand):
+    help = 'Set the member companies of an index (BIST30, BIST100)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('index', choices=INDICES)
+        parser.add_argument('symbols', nargs='*', help='Members, e.g. THYAO.IS ASELS.IS; replaces the current list')
+        parser.add_argument('--add', action='store_true', help='Add to the current members instead of replacing them')
+
+    def handle(self, *args, **options):
+        index = options['index']
+        symbols = list(dict.fromkeys(options['symbols']))
+        known = set(Company.objects.filter(symbol__in=symbols).values_list('symbol', flat=True))
+        unknown = [symbol for symbol in symbols if symbol not in known]
+        if unknown:
+            raise CommandError(f"Bilinmeyen semboller: {', '.join(unknown)}")
+
+        with transaction.atomic():
+            if not options['add']:
+                IndexMembership.objects.filter(index=index).delete()
+            IndexMembership.objects.bulk_create(
+                [IndexMembership(company_id=symbol, index=index) for symbol in symbols],
+                ignore_conflicts=True,
+            )
+            registry.invalidate()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{index}: {IndexMembership.objects.filter(index=index).count()} üye.'
+        ))
@@ -1,54 +1,155 @@
 import csv
+import hashlib
 import json
-from django.core.management.base import BaseCommand
-from core.models import Company
-import os
+import sys
+import time
+from itertools import islice
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from core import fragments, screener
+from core.companies import SECTIONS, invalidate_company
+from core.financials import sync_facts
+from core.models import Company, IndexMembership
+from core.ratios import refresh_metrics
+from core.registry import INDICES, registry
+
+DEFAULT_CSV_PATH = Path(settings.BASE_DIR) / 'data' / 'companies.csv'
+
+
+def content_hash(name, sections):
+    payload = json.dumps({'name': name, **sections}, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
 
 class Command(BaseCommand):
     help = 'Load company data from CSV file'
 
+    def add_arguments(self, parser):
+        parser.add_argument('path', nargs='?', default=str(DEFAULT_CSV_PATH),
+                            help="CSV file to import, or '-' to read from stdin")
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--prune', action='store_true',
+                            help='Delete companies that are not in the CSV')
+
     def handle(self, *args, **options):
-        # CSV dosyasının yolu - doğru lokasyon
-        csv_file_path = r'C:\Users\mazin\Desktop\Stella\Playground\playground\capstone\hissekar\data\companies.csv'
-        
-        self.stdout.write(f"CSV dosyası yolu: {csv_file_path}")
-        
-        if not os.path.exists(csv_file_path):
-            self.stdout.write(self.style.ERROR(f'CSV dosyası bulunamadı: {csv_file_path}'))
+        path = options['path']
+        self.stdout.write(f"CSV dosyası yolu: {path}")
+
+        if path == '-':
+            self.import_rows(csv.DictReader(sys.stdin), options)
+            return
+
+        if not Path(path).exists():
+            raise CommandError(f'CSV dosyası bulunamadı: {path}')
+
+        with open(path, 'r', encoding='utf-8', newline='') as file:
+            self.import_rows(csv.DictReader(file), options)
+
+    def import_rows(self, reader, options):
+        started = time.monotonic()
+        stats = {'rows': 0, 'created': 0, 'updated': 0, 'unchanged': 0, 'errors': 0}
+        seen = set()
+
+        # Tek transaction: tablo hiçbir an boş ya da yarım görünmez
+        with transaction.atomic():
+            for rows in batched(reader, options['batch_size']):
+                self.import_batch(rows, stats, seen)
+
+            if options['prune']:
+                pruned, _ = Company.objects.exclude(symbol__in=seen).delete()
+                self.stdout.write(f'{pruned} kayıt silindi.')
+
+            # Yalnızca değişen satırlar değil, oranları eksik ya da eski olan tüm
+            # şirketler hesaplanır (ör. oran tablosundan önce yüklenmiş veritabanı)
+            if refresh_metrics():
+                screener.invalidate()
+            # Yeni ya da silinen şirketler sembol kayıt defterine yansısın
+            registry.invalidate()
+
+        elapsed = max(time.monotonic() - started, 1e-6)
+        self.stdout.write(self.style.SUCCESS(
+            f"{stats['rows']} satır {elapsed:.2f} saniyede işlendi ({stats['rows'] / elapsed:.0f} satır/sn): "
+            f"{stats['created']} yeni, {stats['updated']} güncellendi, "
+            f"{stats['unchanged']} değişmedi, {stats['errors']} hatalı."
+        ))
+
+    def import_batch(self, rows, stats, seen):
+        companies = []
+        memberships = {}
+        for row in rows:
+            stats['rows'] += 1
+            # Hatalı satır da görülmüş sayılır; --prune mevcut şirketi silmesin
+            if row.get('symbol'):
+                seen.add(row['symbol'])
+            try:
+                missing = [field for field in ('name', 'symbol') if not row.get(field)]
+                if missing:
+                    raise KeyError(', '.join(missing))
+                # JSON verilerini parse et
+                sections = {section: json.loads(row[section]) for section in SECTIONS}
+            except KeyError as e:
+                stats['errors'] += 1
+                self.stdout.write(self.style.ERROR(f'Eksik alan {row.get("symbol") or row.get("name")}: {e}'))
+                continue
+            except json.JSONDecodeError as e:
+                stats['errors'] += 1
+                self.stdout.write(self.style.ERROR(f'JSON parse hatası {row.get("name")}: {e}'))
+                continue
+
+            companies.append(Company(
+                name=row['name'],
+                symbol=row['symbol'],
+                content_hash=content_hash(row['name'], sections),
+                **sections,
+            ))
+            # İsteğe bağlı "indices" sütunu: "BIST30;BIST100"
+            if row.get('indices') is not None:
+                memberships[row['symbol']] = [index for index in row['indices'].split(';') if index in INDICES]
+
+        existing = dict(
+            Company.objects.filter(symbol__in=[company.symbol for company in companies])
+            .values_list('symbol', 'content_hash')
+        )
+        changed = [company for company in companies if existing.get(company.symbol) != company.content_hash]
+        stats['unchanged'] += len(companies) - len(changed)
+        stats['created'] += sum(1 for company in changed if company.symbol not in existing)
+        stats['updated'] += sum(1 for company in changed if company.symbol in existing)
+        if not changed:
+            self.sync_memberships(memberships)
+            return
+
+        Company.objects.bulk_create(
+            changed,
+            update_conflicts=True,
+            unique_fields=['symbol'],
+            update_fields=['name', *SECTIONS, 'content_hash'],
+        )
+        sync_facts(changed)
+
+        symbols = [company.symbol for company in changed]
+        # Önbellek commit'ten sonra temizlenir, aksi halde eski veri tekrar yüklenebilir
+        transaction.on_commit(lambda: [invalidate_company(symbol) for symbol in symbols])
+        transaction.on_commit(lambda: fragments.invalidate(symbols))
+        screener.invalidate()
+        self.sync_memberships(memberships)
+
+    def sync_memberships(self, memberships):
+        """Replace the index memberships of the rows that carried an ``indices`` column."""
+        if not memberships:
             return
-        
-        # Mevcut verileri temizle
-        Company.objects.all().delete()
-        self.stdout.write('Mevcut veriler temizlendi.')
-        
-        # CSV dosyasını oku
-        with open(csv_file_path, 'r', encoding='utf-8') as file:
-            reader = csv.DictReader(file)
-            
-            for row in reader:
-                try:
-                    # JSON verilerini parse et
-                    cash_flow = json.loads(row['cash_flow'])
-                    income_statement = json.loads(row['income_statement'])
-                    balance_sheet = json.loads(row['balance_sheet'])
-                    profitability = json.loads(row['profitability'])
-                    
-                    # Company objesi oluştur
-                    company = Company.objects.create(
-                        name=row['name'],
-                        symbol=row['symbol'],
-                        cash_flow=cash_flow,
-                        income_statement=income_statement,
-                        balance_sheet=balance_sheet,
-                        profitability=profitability
-                    )
-                    
-                    self.stdout.write(f'✓ {company.name} ({company.symbol}) başarıyla eklendi.')
-                    
-                except json.JSONDecodeError as e:
-                    self.stdout.write(self.style.ERROR(f'JSON parse hatası {row["name"]}: {e}'))
-                except Exception as e:
-                    self.stdout.write(self.style.ERROR(f'Hata {row["name"]}: {e}'))
-        
-        total_companies = Company.objects.count()
-        self.stdout.write(self.style.SUCCESS(f'Toplam {total_companies} şirket başarıyla yüklendi!'))
+        IndexMembership.objects.filter(company_id__in=memberships).delete()
+        IndexMembership.objects.bulk_create([
+            IndexMembership(company_id=symbol, index=index)
+            for symbol, indices in memberships.items()
+            for index in dict.fromkeys(indices)
+        ])
@@ -0,0 +1,92 @@
+import math
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.analytics import ANALYTICS_BENCHMARK
+from core.cache import ticker_info_cache
+from core.history import sync_history
+from core.models import Company, CompanyProfile, QuoteSnapshot
+from core import fragments, screener
+from core.quotes import QUOTE_MAX_WORKERS, QUOTE_TIMEOUT, extract_profile, fetch_quotes
+from core.registry import registry
+
+
+def _number(value):
+    # yfinance bazen "Infinity" ya da NaN döndürüyor, bunları boş say
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return value if math.isfinite(value) else None
+
+
+class Command(BaseCommand):
+    help = 'Refresh quote snapshots and company profiles from yfinance'
+
+    def add_arguments(self, parser):
+        parser.add_argument('symbols', nargs='*', help='Symbols to refresh (default: every company)')
+        parser.add_argument('--interval', type=int, default=0,
+                            help='Keep running and refresh every N seconds')
+        parser.add_argument('--workers', type=int, default=QUOTE_MAX_WORKERS)
+        parser.add_argument('--timeout', type=int, default=QUOTE_TIMEOUT)
+        parser.add_argument('--history', action='store_true',
+                            help='Also append new daily price bars to the local history store')
+
+    def handle(self, *args, **options):
+        while True:
+            self.refresh(options['symbols'], options['workers'], options['timeout'])
+            if options['history']:
+                self.refresh_history(options['symbols'])
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
+
+    def refresh(self, symbols, workers, timeout):
+        companies = Company.objects.only('symbol')
+        if symbols:
+            companies = companies.filter(symbol__in=symbols)
+        companies = {company.symbol: company for company in companies}
+
+        started = time.monotonic()
+        # Önbellekteki info eski olabilir, her turda yeniden çek
+        for symbol in companies:
+            ticker_info_cache.invalidate(symbol)
+        quotes = fetch_quotes(companies, timeout=timeout, max_workers=workers)
+
+        refreshed = 0
+        for symbol, quote in quotes.items():
+            if quote['current_price'] is None and quote['market_cap'] is None:
+                self.stdout.write(self.style.WARNING(f'{symbol} için veri alınamadı, eski kayıt korunuyor.'))
+                continue
+
+            company = companies[symbol]
+            QuoteSnapshot.objects.update_or_create(
+                company=company,
+                defaults={field: _number(value) for field, value in quote.items()},
+            )
+            info = ticker_info_cache.get(symbol)
+            if info:
+                CompanyProfile.objects.update_or_create(company=company, defaults=extract_profile(info))
+            refreshed += 1
+        screener.invalidate()
+        # Fiyatlar tüm marketcap tablosunu etkiler, sayfa parçaları topluca yenilenir
+        fragments.invalidate()
+        # Sektör ve uzun isimler değişmiş olabilir
+        registry.invalidate()
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'{refreshed}/{len(companies)} sembol {elapsed:.1f} saniyede güncellendi.'
+        ))
+
+    def refresh_history(self, symbols):
+        # Beta hesabı için endeks barları da güncellenir
+        symbols = symbols or [*Company.objects.values_list('symbol', flat=True), ANALYTICS_BENCHMARK]
+        for symbol in symbols:
+            try:
+                written = sync_history(symbol, '1d')
+            except Exception as e:
+                self.stdout.write(self.style.ERROR(f'{symbol} fiyat geçmişi alınamadı: {e}'))
+                continue
+            self.stdout.write(f'{symbol}: {written} bar yazıldı.')
@@ -0,0 +1,18 @@
+from django.utils.deprecation import MiddlewareMixin
+from htmlmin import middleware as htmlmin
+
+
+# django-htmlmin'in sınıfları yalnızca senkron; zincirde tek bir senkron middleware
+# bile ASGI altında async view'ları tek thread'e kilitler. Aynı hook'lar
+# MiddlewareMixin üzerinden hem senkron hem async çalışır.
+class MarkRequestMiddleware(MiddlewareMixin):
+    """Async-capable ``htmlmin.middleware.MarkRequestMiddleware``."""
+
+    process_request = htmlmin.MarkRequestMiddleware.process_request
+
+
+class HtmlMinifyMiddleware(MiddlewareMixin):
+    """Async-capable ``htmlmin.middleware.HtmlMinifyMiddleware``."""
+
+    can_minify_response = htmlmin.HtmlMinifyMiddleware.can_minify_response
+    process_response = htmlmin.HtmlMinifyMiddleware.process_response
@@ -0,0 +1,57 @@
+# Generated by Django 5.0 on 2026-10-17 18:08
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CompanyProfile',
+            fields=[
+                ('company', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='profile', serialize=False, to='core.company')),
+                ('long_name', models.CharField(blank=True, max_length=255, null=True)),
+                ('address', models.CharField(blank=True, max_length=255, null=True)),
+                ('city', models.CharField(blank=True, max_length=100, null=True)),
+                ('country', models.CharField(blank=True, max_length=100, null=True)),
+                ('phone', models.CharField(blank=True, max_length=50, null=True)),
+                ('website', models.URLField(blank=True, null=True)),
+                ('sector', models.CharField(blank=True, max_length=100, null=True)),
+                ('industry', models.CharField(blank=True, max_length=100, null=True)),
+                ('long_description', models.TextField(blank=True, null=True)),
+                ('ceo', models.CharField(blank=True, max_length=255, null=True)),
+                ('cfo', models.CharField(blank=True, max_length=255, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='QuoteSnapshot',
+            fields=[
+                ('company', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='quote', serialize=False, to='core.company')),
+                ('current_price', models.FloatField(null=True)),
+                ('previous_close', models.FloatField(null=True)),
+                ('volume', models.BigIntegerField(null=True)),
+                ('market_cap', models.BigIntegerField(null=True)),
+                ('high_52w', models.FloatField(null=True)),
+                ('low_52w', models.FloatField(null=True)),
+                ('pe_ratio', models.FloatField(null=True)),
+                ('price_to_book', models.FloatField(null=True)),
+                ('enterprise_value', models.BigIntegerField(null=True)),
+                ('ebitda', models.BigIntegerField(null=True)),
+                ('ev_ebitda', models.FloatField(null=True)),
+                ('free_cash_flow', models.BigIntegerField(null=True)),
+                ('total_debt', models.BigIntegerField(null=True)),
+                ('total_cash', models.BigIntegerField(null=True)),
+                ('roa', models.FloatField(null=True)),
+                ('roe', models.FloatField(null=True)),
+                ('current_ratio', models.FloatField(null=True)),
+                ('quick_ratio', models.FloatField(null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
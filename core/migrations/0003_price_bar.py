@@ -0,0 +1,31 @@
+# Generated by Django 5.0 on 2026-10-17 18:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_quote_snapshot_company_profile'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PriceBar',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('symbol', models.CharField(max_length=20)),
+                ('interval', models.CharField(max_length=5)),
+                ('timestamp', models.DateTimeField()),
+                ('open', models.FloatField(null=True)),
+                ('high', models.FloatField(null=True)),
+                ('low', models.FloatField(null=True)),
+                ('close', models.FloatField()),
+                ('volume', models.BigIntegerField(null=True)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='pricebar',
+            constraint=models.UniqueConstraint(fields=('symbol', 'interval', 'timestamp'), name='unique_price_bar'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.0 on 2026-10-17 18:11
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_price_bar'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FinancialFact',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('statement', models.CharField(choices=[('cash_flow', 'Cash Flow'), ('income_statement', 'Income Statement'), ('balance_sheet', 'Balance Sheet'), ('profitability', 'Profitability')], max_length=20)),
+                ('period_end', models.DateField()),
+                ('item_code', models.CharField(max_length=10)),
+                ('value', models.FloatField()),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='facts', to='core.company')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['statement', 'item_code', 'period_end', 'value'], name='fact_screen_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='financialfact',
+            constraint=models.UniqueConstraint(fields=('company', 'statement', 'period_end', 'item_code'), name='unique_financial_fact'),
+        ),
+    ]
@@ -0,0 +1,54 @@
+from datetime import date
+
+from django.db import migrations
+
+STATEMENTS = ('cash_flow', 'income_statement', 'balance_sheet', 'profitability')
+
+
+def parse_period(key):
+    try:
+        if len(key) == 4:
+            return date(int(key), 12, 31)
+        return date.fromisoformat(key)
+    except ValueError:
+        return None
+
+
+def populate_facts(apps, schema_editor):
+    Company = apps.get_model('core', 'Company')
+    FinancialFact = apps.get_model('core', 'FinancialFact')
+
+    facts = []
+    for company in Company.objects.all().iterator():
+        for statement in STATEMENTS:
+            for period_key, items in (getattr(company, statement) or {}).items():
+                period_end = parse_period(period_key)
+                if period_end is None or not isinstance(items, dict):
+                    continue
+                for item_code, raw in items.items():
+                    if item_code == 'date' or isinstance(raw, bool):
+                        continue
+                    try:
+                        value = float(raw)
+                    except (TypeError, ValueError):
+                        continue
+                    facts.append(FinancialFact(
+                        company=company, statement=statement, period_end=period_end,
+                        item_code=item_code, value=value,
+                    ))
+    FinancialFact.objects.bulk_create(facts, batch_size=1000)
+
+
+def clear_facts(apps, schema_editor):
+    apps.get_model('core', 'FinancialFact').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_financial_fact'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_facts, clear_facts),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0 on 2026-10-17 18:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_populate_financial_facts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='company',
+            name='content_hash',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.0 on 2026-10-17 18:15
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_company_content_hash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DerivedMetric',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period_end', models.DateField()),
+                ('metric', models.CharField(max_length=30)),
+                ('value', models.FloatField()),
+                ('source_hash', models.CharField(max_length=64)),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='metrics', to='core.company')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['metric', 'period_end', 'value'], name='metric_screen_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='derivedmetric',
+            constraint=models.UniqueConstraint(fields=('company', 'period_end', 'metric'), name='unique_derived_metric'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.0 on 2026-10-17 18:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_derived_metric'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='companyprofile',
+            name='sector',
+            field=models.CharField(blank=True, db_index=True, max_length=100, null=True),
+        ),
+        migrations.AlterField(
+            model_name='quotesnapshot',
+            name='market_cap',
+            field=models.BigIntegerField(db_index=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='quotesnapshot',
+            name='pe_ratio',
+            field=models.FloatField(db_index=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='quotesnapshot',
+            name='volume',
+            field=models.BigIntegerField(db_index=True, null=True),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.0 on 2026-10-17 18:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_datatables_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IndexMembership',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('index', models.CharField(choices=[('BIST30', 'BIST 30'), ('BIST100', 'BIST 100')], max_length=20)),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='indices', to='core.company')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='indexmembership',
+            constraint=models.UniqueConstraint(fields=('company', 'index'), name='unique_index_membership'),
+        ),
+    ]
@@ -7,4 +7,116 @@ class Company(models.Model):
   income_statement = models.JSONField() 
   balance_sheet = models.JSONField() 
   profitability = models.JSONField()  
+  content_hash = models.CharField(max_length=64, blank=True, default='')  # load_companies değişmeyen satırları atlar
 
+
+
+class IndexMembership(models.Model):
+  INDICES = [
+    ('BIST30', 'BIST 30'),
+    ('BIST100', 'BIST 100'),
+  ]
+
+  company = models.ForeignKey(Company, on_delete=models.CASCADE, related_name='indices')
+  index = models.CharField(max_length=20, choices=INDICES)
+
+  class Meta:
+    constraints = [
+      models.UniqueConstraint(fields=['company', 'index'], name='unique_index_membership'),
+    ]
+
+
+class QuoteSnapshot(models.Model):
+  company = models.OneToOneField(Company, on_delete=models.CASCADE, primary_key=True, related_name='quote')
+  current_price = models.FloatField(null=True)
+  previous_close = models.FloatField(null=True)
+  volume = models.BigIntegerField(null=True, db_index=True)
+  market_cap = models.BigIntegerField(null=True, db_index=True)
+  high_52w = models.FloatField(null=True)
+  low_52w = models.FloatField(null=True)
+  pe_ratio = models.FloatField(null=True, db_index=True)
+  price_to_book = models.FloatField(null=True)
+  enterprise_value = models.BigIntegerField(null=True)
+  ebitda = models.BigIntegerField(null=True)
+  ev_ebitda = models.FloatField(null=True)
+  free_cash_flow = models.BigIntegerField(null=True)
+  total_debt = models.BigIntegerField(null=True)
+  total_cash = models.BigIntegerField(null=True)
+  roa = models.FloatField(null=True)
+  roe = models.FloatField(null=True)
+  current_ratio = models.FloatField(null=True)
+  quick_ratio = models.FloatField(null=True)
+  updated_at = models.DateTimeField(auto_now=True)
+
+
+class CompanyProfile(models.Model):
+  company = models.OneToOneField(Company, on_delete=models.CASCADE, primary_key=True, related_name='profile')
+  long_name = models.CharField(max_length=255, blank=True, null=True)
+  address = models.CharField(max_length=255, blank=True, null=True)
+  city = models.CharField(max_length=100, blank=True, null=True)
+  country = models.CharField(max_length=100, blank=True, null=True)
+  phone = models.CharField(max_length=50, blank=True, null=True)
+  website = models.URLField(blank=True, null=True)
+  sector = models.CharField(max_length=100, blank=True, null=True, db_index=True)
+  industry = models.CharField(max_length=100, blank=True, null=True)
+  long_description = models.TextField(blank=True, null=True)
+  ceo = models.CharField(max_length=255, blank=True, null=True)
+  cfo = models.CharField(max_length=255, blank=True, null=True)
+  updated_at = models.DateTimeField(auto_now=True)
+
+
+class PriceBar(models.Model):
+  # Endeksler (ör. XU100.IS) de saklandığı için Company'ye bağlı değil
+  symbol = models.CharField(max_length=20)
+  interval = models.CharField(max_length=5)
+  timestamp = models.DateTimeField()
+  open = models.FloatField(null=True)
+  high = models.FloatField(null=True)
+  low = models.FloatField(null=True)
+  close = models.FloatField()
+  volume = models.BigIntegerField(null=True)
+
+  class Meta:
+    constraints = [
+      models.UniqueConstraint(fields=['symbol', 'interval', 'timestamp'], name='unique_price_bar'),
+    ]
+
+
+class FinancialFact(models.Model):
+  STATEMENTS = [
+    ('cash_flow', 'Cash Flow'),
+    ('income_statement', 'Income Statement'),
+    ('balance_sheet', 'Balance Sheet'),
+    ('profitability', 'Profitability'),
+  ]
+
+  company = models.ForeignKey(Company, on_delete=models.CASCADE, related_name='facts')
+  statement = models.CharField(max_length=20, choices=STATEMENTS)
+  period_end = models.DateField()
+  item_code = models.CharField(max_length=10)  # "CFFOA", "EBITDA", "TA"...
+  value = models.FloatField()
+
+  class Meta:
+    constraints = [
+      models.UniqueConstraint(fields=['company', 'statement', 'period_end', 'item_code'], name='unique_financial_fact'),
+    ]
+    indexes = [
+      # Şirketler arası taramalar: "2023'te EBITDA > X"
+      models.Index(fields=['statement', 'item_code', 'period_end', 'value'], name='fact_screen_idx'),
+    ]
+
+
+class DerivedMetric(models.Model):
+  company = models.ForeignKey(Company, on_delete=models.CASCADE, related_name='metrics')
+  period_end = models.DateField()
+  metric = models.CharField(max_length=30)  # "net_margin", "roe", "revenue_cagr_3y"...
+  value = models.FloatField()
+  source_hash = models.CharField(max_length=64)  # hesaplandığı andaki Company.content_hash
+
+  class Meta:
+    constraints = [
+      models.UniqueConstraint(fields=['company', 'period_end', 'metric'], name='unique_derived_metric'),
+    ]
+    indexes = [
+      models.Index(fields=['metric', 'period_end', 'value'], name='metric_screen_idx'),
+    ]
@@ -0,0 +1,205 @@
+import logging
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+import pandas as pd
+
+from .cache import ticker_info_cache
+from .upstream import UpstreamUnavailable, yahoo
+
+logger = logging.getLogger(__name__)
+
+# Tek bir sembol için beklenecek en uzun süre (saniye)
+QUOTE_TIMEOUT = 10
+# Aynı anda açık tutulacak en fazla upstream isteği
+QUOTE_MAX_WORKERS = 8
+
+QUOTE_FIELDS = (
+    "current_price",
+    "previous_close",
+    "volume",
+    "market_cap",
+    "high_52w",
+    "low_52w",
+    "pe_ratio",
+    "price_to_book",
+    "enterprise_value",
+    "ebitda",
+    "ev_ebitda",
+    "free_cash_flow",
+    "total_debt",
+    "total_cash",
+    "roa",
+    "roe",
+    "current_ratio",
+    "quick_ratio",
+)
+
+PROFILE_FIELDS = (
+    "long_name",
+    "address",
+    "city",
+    "country",
+    "phone",
+    "website",
+    "sector",
+    "industry",
+    "long_description",
+    "ceo",
+    "cfo",
+)
+
+CEO_TITLES = ("ceo", "chief executive", "gm", "general manager")
+CFO_TITLES = ("cfo", "chief financial", "head of financial", "director of finance", "financial director")
+
+
+def empty_quote():
+    """Quote row used when a symbol could not be fetched in time."""
+    return dict.fromkeys(QUOTE_FIELDS)
+
+
+def fetch_quote(symbol, timeout=QUOTE_TIMEOUT):
+    """Fetch the raw quote fields the marketcap table needs for one symbol."""
+    info = ticker_info_cache.get_info(symbol)
+
+    try:
+        history = yahoo.history(symbol, period="5d", timeout=timeout)
+    except Exception:
+        # Fiyat geçmişi alınamazsa info'daki fiyatlara düşülür
+        history = pd.DataFrame()
+    if not history.empty:
+        current_price = float(history["Close"].iloc[-1])
+        volume = int(history["Volume"].iloc[-1])
+    else:
+        current_price = info.get("currentPrice") or info.get("regularMarketPrice")
+        volume = info.get("volume")
+
+    if len(history) > 1:
+        previous_close = float(history["Close"].iloc[-2])
+    else:
+        previous_close = info.get("previousClose")
+
+    pe_ratio = info.get("trailingPE")
+    if pe_ratio is not None:
+        pe_ratio = float(pe_ratio)
+
+    enterprise_value = info.get("enterpriseValue")
+    ebitda = info.get("ebitda")
+    ev_ebitda = info.get("enterpriseToEbitda")
+    if ev_ebitda is None and enterprise_value is not None and ebitda:
+        ev_ebitda = enterprise_value / ebitda
+
+    return {
+        "current_price": current_price,
+        "previous_close": previous_close,
+        "volume": volume,
+        "market_cap": info.get("marketCap"),
+        "high_52w": info.get("fiftyTwoWeekHigh"),
+        "low_52w": info.get("fiftyTwoWeekLow"),
+        "pe_ratio": pe_ratio,
+        "price_to_book": info.get("priceToBook"),
+        "enterprise_value": enterprise_value,
+        "ebitda": ebitda,
+        "ev_ebitda": ev_ebitda,
+        "free_cash_flow": info.get("freeCashflow"),
+        "total_debt": info.get("totalDebt"),
+        "total_cash": info.get("totalCash"),
+        "roa": info.get("returnOnAssets"),
+        "roe": info.get("returnOnEquity"),
+        "current_ratio": info.get("currentRatio"),
+        "quick_ratio": info.get("quickRatio"),
+    }
+
+
+def extract_profile(info):
+    """Pick the descriptive company fields shown on the profile page out of ``info``."""
+    ceo = "N/A"
+    cfo = "N/A"
+    for officer in info.get("companyOfficers", []):
+        title = officer.get("title", "").lower()  # Unvanı küçük harfe dönüştür
+        if any(key in title for key in CEO_TITLES):
+            ceo = officer.get("name", "N/A")
+        elif any(key in title for key in CFO_TITLES):
+            cfo = officer.get("name", "N/A")
+
+    return {
+        "long_name": info.get("longName"),
+        "address": info.get("address2"),
+        "city": info.get("city"),
+        "country": info.get("country"),
+        "phone": info.get("phone"),
+        "website": info.get("website"),
+        "sector": info.get("sector"),
+        "industry": info.get("industry"),
+        "long_description": info.get("longBusinessSummary"),
+        "ceo": ceo,
+        "cfo": cfo,
+    }
+
+
+def fetch_quotes(symbols, timeout=QUOTE_TIMEOUT, max_workers=QUOTE_MAX_WORKERS):
+    """Fetch quotes for many symbols through a bounded thread pool.
+
+    ``timeout`` bounds each upstream call; the batch as a whole waits at most
+    ``timeout`` per pool "wave". Symbols that fail or miss the deadline come
+    back as an empty quote instead of failing the whole batch. The result
+    keeps the order of ``symbols``.
+    """
+    symbols = list(symbols)
+    quotes = {symbol: empty_quote() for symbol in symbols}
+    if not symbols:
+        return quotes
+
+    workers = max(1, min(max_workers, len(symbols)))
+    deadline = time.monotonic() + timeout * math.ceil(len(symbols) / workers)
+
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="quotes")
+    try:
+        futures = {symbol: executor.submit(fetch_quote, symbol, timeout) for symbol in symbols}
+        for symbol, future in futures.items():
+            remaining = max(0, deadline - time.monotonic())
+            try:
+                quotes[symbol] = future.result(timeout=remaining)
+            except TimeoutError:
+                future.cancel()
+                logger.warning("Quote fetch timed out for %s", symbol)
+            except UpstreamUnavailable as e:
+                logger.warning("Quote fetch skipped for %s: %s", symbol, e)
+            except Exception:
+                logger.exception("Quote fetch failed for %s", symbol)
+    finally:
+        # Geç kalan isteklerin bitmesini beklemeden sayfayı döndür
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    return quotes
+
+
+def fetch_last_prices(symbols, timeout=QUOTE_TIMEOUT):
+    """Latest intraday price for many symbols from a single batched upstream request.
+
+    Returns ``{symbol: {"price": ..., "time": <epoch seconds>}}``; symbols
+    without a trade today are left out.
+    """
+    symbols = list(symbols)
+    if not symbols:
+        return {}
+
+    frame = yahoo.download(
+        symbols, period="1d", interval="1m", group_by="column",
+        auto_adjust=False, progress=False, threads=False, timeout=timeout,
+    )
+    if frame.empty:
+        return {}
+
+    closes = frame["Close"]
+    # Tek sembolde yfinance düz sütun döndürebiliyor
+    if closes.ndim == 1:
+        closes = closes.to_frame(symbols[0])
+
+    prices = {}
+    for symbol in closes.columns:
+        series = closes[symbol].dropna()
+        if not series.empty:
+            prices[symbol] = {"price": float(series.iloc[-1]), "time": int(series.index[-1].timestamp())}
+    return prices
@@ -0,0 +1,125 @@
+import numpy as np
+import pandas as pd
+from django.db import transaction
+
+from .financials import facts_frame
+from .models import Company, DerivedMetric
+
+# Oranların dayandığı kalemler (bkz. data/companies.csv kısaltmaları)
+INPUTS = {
+    'income_statement': ['SR', 'GP', 'OP', 'EBIT', 'EBITDA', 'NI'],
+    'balance_sheet': ['TA', 'TL', 'TSE', 'CA', 'CL', 'INV', 'CE', 'OSTI', 'FD'],
+    'cash_flow': ['CFFOA', 'CAPEX'],
+}
+
+# compute_metrics çıktısındaki sütunlar, sırasıyla
+METRICS = (
+    'gross_margin', 'operating_margin', 'ebit_margin', 'ebitda_margin', 'net_margin', 'fcf_margin',
+    'revenue_growth', 'ebitda_growth', 'net_income_growth', 'revenue_cagr_3y',
+    'roe', 'roa',
+    'debt_to_equity', 'liabilities_to_assets', 'net_debt', 'net_debt_to_ebitda',
+    'ebitda_to_debt', 'cfo_to_debt',
+    'current_ratio', 'quick_ratio', 'cash_ratio', 'nwc_to_assets', 'free_cash_flow',
+)
+
+
+def statements_frame(symbols):
+    """All ratio inputs side by side, indexed by (symbol, period_end)."""
+    frames = [facts_frame(symbols, statement, items) for statement, items in INPUTS.items()]
+    frame = pd.concat(frames, axis=1)
+    # Bir tabloda hiç olmayan kalemler de sütun olarak bulunsun
+    items = [item for items in INPUTS.values() for item in items]
+    return frame.reindex(columns=items)
+
+
+def _growth(series, periods=1):
+    return series.groupby(level='symbol').pct_change(periods=periods, fill_method=None) * 100
+
+
+def _cagr(series, years):
+    previous = series.groupby(level='symbol').shift(years)
+    ratio = (series / previous).where((series > 0) & (previous > 0))
+    return (ratio ** (1 / years) - 1) * 100
+
+
+def compute_metrics(frame):
+    """Derive the ratio library from a ``statements_frame`` in one vectorized pass."""
+    f = frame
+    net_debt = f['FD'] - f['CE'] - f['OSTI'].fillna(0)
+    free_cash_flow = f['CFFOA'] + f['CAPEX']  # CAPEX negatif geliyor
+
+    metrics = pd.DataFrame({
+        # Marjlar (%)
+        'gross_margin': f['GP'] / f['SR'] * 100,
+        'operating_margin': f['OP'] / f['SR'] * 100,
+        'ebit_margin': f['EBIT'] / f['SR'] * 100,
+        'ebitda_margin': f['EBITDA'] / f['SR'] * 100,
+        'net_margin': f['NI'] / f['SR'] * 100,
+        'fcf_margin': free_cash_flow / f['SR'] * 100,
+        # Büyüme (%)
+        'revenue_growth': _growth(f['SR']),
+        'ebitda_growth': _growth(f['EBITDA']),
+        'net_income_growth': _growth(f['NI']),
+        'revenue_cagr_3y': _cagr(f['SR'], 3),
+        # Getiri (%)
+        'roe': f['NI'] / f['TSE'] * 100,
+        'roa': f['NI'] / f['TA'] * 100,
+        # Kaldıraç
+        'debt_to_equity': f['FD'] / f['TSE'],
+        'liabilities_to_assets': f['TL'] / f['TA'],
+        'net_debt': net_debt,
+        'net_debt_to_ebitda': net_debt / f['EBITDA'],
+        # Karşılama
+        'ebitda_to_debt': f['EBITDA'] / f['FD'],
+        'cfo_to_debt': f['CFFOA'] / f['FD'],
+        # İşletme sermayesi
+        'current_ratio': f['CA'] / f['CL'],
+        'quick_ratio': (f['CA'] - f['INV']) / f['CL'],
+        'cash_ratio': f['CE'] / f['CL'],
+        'nwc_to_assets': (f['CA'] - f['CL']) / f['TA'],
+        'free_cash_flow': free_cash_flow,
+    }, index=f.index)
+    return metrics.replace([np.inf, -np.inf], np.nan)
+
+
+def stale_companies(symbols=None):
+    """Companies whose stored metrics were computed from an older content hash."""
+    companies = Company.objects.only('symbol', 'content_hash')
+    if symbols is not None:
+        companies = companies.filter(symbol__in=symbols)
+
+    computed = {}
+    for symbol, source_hash in DerivedMetric.objects.values_list('company_id', 'source_hash').distinct():
+        computed.setdefault(symbol, set()).add(source_hash)
+    return [company for company in companies if computed.get(company.symbol) != {company.content_hash}]
+
+
+def refresh_metrics(symbols=None, force=False):
+    """Recompute and persist metrics for companies whose facts changed. Returns rows written."""
+    if force:
+        companies = Company.objects.only('symbol', 'content_hash')
+        if symbols is not None:
+            companies = companies.filter(symbol__in=symbols)
+        companies = list(companies)
+    else:
+        companies = stale_companies(symbols)
+    if not companies:
+        return 0
+
+    hashes = {company.symbol: company.content_hash for company in companies}
+    long = compute_metrics(statements_frame(list(hashes))).stack().rename('value').reset_index()
+    long.columns = ['symbol', 'period_end', 'metric', 'value']
+
+    rows = [
+        DerivedMetric(
+            company_id=row.symbol, period_end=row.period_end, metric=row.metric,
+            value=row.value, source_hash=hashes[row.symbol],
+        )
+        for row in long.itertuples(index=False)
+        if pd.notna(row.value)
+    ]
+    with transaction.atomic():
+        DerivedMetric.objects.filter(company_id__in=hashes).delete()
+        DerivedMetric.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
+
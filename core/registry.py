@@ -0,0 +1,132 @@
+import hashlib
+from bisect import bisect_left
+
+from django.conf import settings
+from django.db import transaction
+
+from .cache import TTLCache
+from .models import Company, IndexMembership
+
+INDICES = [index for index, _ in IndexMembership.INDICES]
+
+# Tek girdi: tüm şirketlerin sembol dizini. Süre dolunca (ya da import sonrası)
+# ilk erişimde yeniden okunur; diğer worker'lar da en geç bu sürede günceller.
+registry_cache = TTLCache(
+    ttl=getattr(settings, 'SYMBOL_REGISTRY_TTL', 300),
+    maxsize=1,
+)
+
+
+def code(symbol):
+    """Exchange code shown to users: "ARCLK.IS" -> "ARCLK"."""
+    return symbol.split('.', 1)[0]
+
+
+def _key(text):
+    return (text or '').casefold()
+
+
+def build_index():
+    """Load every company once into lookup tables for the registry."""
+    entries = {}
+    for symbol, name, long_name, sector in Company.objects.order_by('symbol').values_list(
+        'symbol', 'name', 'profile__long_name', 'profile__sector',
+    ):
+        entries[symbol] = {
+            'symbol': symbol,
+            'code': code(symbol),
+            'name': name,
+            'long_name': long_name,
+            'sector': sector,
+            'indices': [],
+        }
+
+    members = {index: [] for index in INDICES}
+    for symbol, index in IndexMembership.objects.order_by('company_id').values_list('company_id', 'index'):
+        entries[symbol]['indices'].append(index)
+        members[index].append(symbol)
+
+    # Önek araması için sıralı (anahtar, sıra, sembol) listesi; kod eşleşmeleri isimlerden önce gelir
+    search = sorted(
+        (key, rank, symbol)
+        for symbol, entry in entries.items()
+        for rank, key in enumerate((_key(entry['code']), _key(entry['name']), _key(entry['long_name'])))
+        if key
+    )
+    # Sembol listesinin kısa özeti; liste değişince sayfa parçası anahtarları da değişir
+    revision = hashlib.sha1(','.join(entries).encode()).hexdigest()[:12]
+    return {'entries': entries, 'members': members, 'search': search, 'revision': revision}
+
+
+class SymbolRegistry:
+    """The symbol universe, backed by ``Company`` and held in memory.
+
+    Symbols, names, sectors and index membership are read in one pass the
+    first time they are needed and then answered from dicts; ``search`` does
+    a binary search over sorted keys. ``invalidate`` (called by the importer
+    and the market data refresher) makes the next access reload.
+    """
+
+    def _index(self):
+        return registry_cache.get_or_set('index', build_index)
+
+    def symbols(self, index=None):
+        """Every symbol in order, or the members of ``index`` ("BIST30", "BIST100")."""
+        data = self._index()
+        if index is None:
+            return list(data['entries'])
+        if index not in data['members']:
+            raise ValueError(f"Unknown index: {index}")
+        return list(data['members'][index])
+
+    def revision(self):
+        """Short digest of the symbol list, for cache keys of pages that list every company."""
+        return self._index()['revision']
+
+    def get(self, symbol):
+        """Registry entry for ``symbol``, or None if it isn't a known company."""
+        return self._index()['entries'].get(symbol)
+
+    def __contains__(self, symbol):
+        return symbol in self._index()['entries']
+
+    def name(self, symbol):
+        entry = self.get(symbol)
+        return entry['name'] if entry else None
+
+    def sector(self, symbol):
+        entry = self.get(symbol)
+        return entry['sector'] if entry else None
+
+    def is_member(self, symbol, index):
+        entry = self.get(symbol)
+        return bool(entry) and index in entry['indices']
+
+    def search(self, prefix, limit=10, index=None):
+        """Entries whose code, name or long name starts with ``prefix`` (case-insensitive)."""
+        prefix = _key(prefix.strip())
+        if not prefix:
+            return []
+        data = self._index()
+        allowed = set(self.symbols(index)) if index is not None else None
+
+        matches = []
+        search = data['search']
+        for key, rank, symbol in search[bisect_left(search, (prefix,)):]:
+            if not key.startswith(prefix):
+                break
+            if allowed is None or symbol in allowed:
+                matches.append((rank, key, symbol))
+
+        results = []
+        for _, _, symbol in sorted(matches):
+            if symbol not in results:
+                results.append(symbol)
+        return [data['entries'][symbol] for symbol in results[:limit]]
+
+    def invalidate(self):
+        """Reload the registry once the current transaction commits."""
+        transaction.on_commit(registry_cache.clear)
+
+
+registry = SymbolRegistry()
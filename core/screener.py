@@ -0,0 +1,178 @@
+import math
+import operator
+import re
+import time
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from django.db import transaction
+
+from .cache import TTLCache
+from .datatables import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, int_param
+from .models import Company, CompanyProfile, DerivedMetric, QuoteSnapshot
+from .quotes import QUOTE_FIELDS
+from .ratios import METRICS
+
+OPERATORS = {
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+    '=': operator.eq,
+    '==': operator.eq,
+    '!=': operator.ne,
+}
+
+# "pe_ratio < 10", "roe >= 20%" ; yüzde işareti yalnızca okunabilirlik içindir
+CONDITION = re.compile(r'^\s*([a-z][a-z0-9_]*)\s*(<=|>=|==|!=|<|>|=)\s*(-?\d+(?:\.\d+)?(?:e-?\d+)?)\s*%?\s*$', re.IGNORECASE)
+AND = re.compile(r'\s+and\s+|\s*&&\s*|\s*,\s*', re.IGNORECASE)
+
+DEFAULT_COLUMNS = ('market_cap', 'pe_ratio')
+
+# Tüm şirketlerin son dönem oranları ve fiyat verileri tek bir geniş tabloda tutulur
+universe_cache = TTLCache(
+    ttl=getattr(settings, 'SCREENER_CACHE_TTL', 300),
+    maxsize=1,
+)
+
+
+def quote_column(field):
+    # Hem oran tablosunda hem fiyat verisinde olan alanlar (roe, roa, ...) oran tablosundan gelir;
+    # yfinance değerleri "quote_" önekiyle erişilebilir.
+    return f'quote_{field}' if field in METRICS else field
+
+
+def fields():
+    """Every field a screen can filter or sort on."""
+    return [*METRICS, *(quote_column(field) for field in QUOTE_FIELDS)]
+
+
+def build_universe():
+    """One row per company: name, sector, metrics of its latest period and the quote snapshot."""
+    frame = pd.DataFrame.from_records(
+        Company.objects.values_list('symbol', 'name'), columns=['symbol', 'name'],
+    ).set_index('symbol')
+
+    sectors = dict(CompanyProfile.objects.values_list('company_id', 'sector'))
+    frame['sector'] = frame.index.map(sectors)
+
+    rows = pd.DataFrame.from_records(
+        DerivedMetric.objects.values_list('company_id', 'metric', 'period_end', 'value'),
+        columns=['symbol', 'metric', 'period_end', 'value'],
+    )
+    # Şirketin en güncel dönemi; tüm metrikler bu dönemden alınır ki bir
+    # satırda farklı yılların değerleri karışmasın
+    latest_period = rows.groupby('symbol')['period_end'].transform('max')
+    latest = (
+        rows[rows['period_end'] == latest_period]
+        .pivot(index='symbol', columns='metric', values='value')
+        .reindex(columns=list(METRICS))
+    )
+    frame = frame.join(latest.astype('float64'))
+
+    quotes = pd.DataFrame.from_records(
+        QuoteSnapshot.objects.values_list('company_id', *QUOTE_FIELDS),
+        columns=['symbol', *QUOTE_FIELDS],
+    ).set_index('symbol')
+    quotes.columns = [quote_column(field) for field in quotes.columns]
+    frame = frame.join(quotes.astype('float64'))
+
+    return frame.sort_index()
+
+
+def get_universe():
+    return universe_cache.get_or_set('universe', build_universe)
+
+
+def invalidate():
+    """Drop the cached universe once the current transaction commits."""
+    transaction.on_commit(universe_cache.clear)
+
+
+def parse_conditions(expression, available):
+    """``"pe_ratio < 10 AND roe > 20%"`` -> ``[(field, op, value), ...]``."""
+    conditions = []
+    for part in AND.split((expression or '').strip()):
+        if not part:
+            continue
+        match = CONDITION.match(part)
+        if match is None:
+            raise ValueError(f"Invalid condition: {part}")
+        field, op, value = match.group(1).lower(), match.group(2), float(match.group(3))
+        if field not in available:
+            raise ValueError(f"Unknown field: {field}")
+        conditions.append((field, op, value))
+    return conditions
+
+
+def parse_sort(raw, available):
+    fields = [field.strip() for field in (raw or '').split(',') if field.strip()]
+    for field in fields:
+        if field.lstrip('-') not in available and field.lstrip('-') != 'symbol':
+            raise ValueError(f"Unknown sort field: {field.lstrip('-')}")
+    return fields
+
+
+def screen(params):
+    """Filter the universe with the ``q`` conditions and return one sorted page.
+
+    Conditions are applied as vectorized boolean masks; missing values never
+    match. Raises ``ValueError`` for malformed parameters.
+    """
+    started = time.perf_counter()
+    available = set(fields())
+    conditions = parse_conditions(params.get('q'), available)
+    sort = parse_sort(params.get('sort'), available)
+    page = int_param(params, 'page', 1)
+    page_size = int_param(params, 'page_size', DEFAULT_PAGE_SIZE, maximum=MAX_PAGE_SIZE)
+
+    universe = get_universe()
+    mask = np.ones(len(universe), dtype=bool)
+    for field, op, value in conditions:
+        column = universe[field]
+        mask &= (OPERATORS[op](column, value) & column.notna()).to_numpy()
+
+    sector = params.get('sector')
+    if sector:
+        mask &= (universe['sector'] == sector).to_numpy()
+
+    matched = universe[mask]
+    if sort:
+        keys = [field.lstrip('-') for field in sort]
+        ascending = [not field.startswith('-') for field in sort]
+        # Sayfalar arası kararlı sıra için sembol her zaman son anahtardır
+        if 'symbol' not in keys:
+            keys.append('symbol')
+            ascending.append(True)
+        # Sembol index'te; sıralama için geçici olarak sütuna alınır
+        matched = (
+            matched.reset_index()
+            .sort_values(keys, ascending=ascending, na_position='last')
+            .set_index('symbol')
+        )
+
+    filtered = len(matched)
+    pages = max(math.ceil(filtered / page_size), 1)
+    page = min(page, pages)
+    offset = (page - 1) * page_size
+
+    columns = list(dict.fromkeys([
+        'name', 'sector', *DEFAULT_COLUMNS,
+        *(field for field, _, _ in conditions),
+        *(field.lstrip('-') for field in sort if field.lstrip('-') != 'symbol'),
+    ]))
+    window = matched.iloc[offset:offset + page_size][columns].reset_index()
+    window = window.astype(object).where(window.notna(), None)
+
+    return {
+        'results': window.to_dict('records'),
+        'columns': ['symbol', *columns],
+        'conditions': [{'field': field, 'op': op, 'value': value} for field, op, value in conditions],
+        'page': page,
+        'page_size': page_size,
+        'pages': pages,
+        'total': len(universe),
+        'filtered': filtered,
+        'took_ms': round((time.perf_counter() - started) * 1000, 2),
+    }
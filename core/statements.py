@@ -0,0 +1,136 @@
+from django.conf import settings
+from django.utils.formats import localize
+from django.utils.translation import get_language
+
+from .cache import TTLCache
+
+# Şablonda gösterilen satırlar: (JSON anahtarı, etiket, kalın mı)
+ROWS = {
+    'profitability': (
+        ('TR', 'Revenue', False),
+        ('GP', 'Gross Profit', False),
+        ('OI', 'Operating Income', False),
+        ('NOPAT', 'NOPAT', False),
+        ('EBIT', 'EBIT', False),
+        ('EBITDA', 'EBITDA', False),
+        ('NI', 'Net Income', False),
+        ('FCFF', 'FCFF', False),
+    ),
+    'balance_sheet': (
+        ('TA', 'Total Assets', True),
+        ('CA', 'Current Assets', True),
+        ('CE', 'Cash and Cash Equivalents', False),
+        ('OSTI', 'Other Short Term Investments', False),
+        ('INV', 'Inventory', False),
+        ('NCA', 'Non Current Assets', True),
+        ('TL', 'Total Liabilities', True),
+        ('CL', 'Current Liabilities', True),
+        ('STD', 'Short Term Debt', False),
+        ('NCL', 'Non Current Liabilities', True),
+        ('LTD', 'Long Term Debt', False),
+        ('TSE', "Total Shareholder's Equity", True),
+        ('MI', 'Minority Interest', False),
+        ('CS', 'Common Stock', False),
+        ('RE', 'Retained Earnings', False),
+        ('TS', 'Treasury Stock', False),
+        ('NWC', 'Net Working Capital', False),
+        ('FD', 'Financial Debt', False),
+        ('ND', 'Net Debt', False),
+        ('ON', 'Operational NWC', False),
+        ('CONW', 'Change in Operational NWC', False),
+    ),
+    'income_statement': (
+        ('SR', 'Sales Revenue', True),
+        ('COGS', 'COGS', False),
+        ('GP', 'Gross Profit', True),
+        ('OPEX', 'OPEX', False),
+        ('GAA', 'General & Administrative Expense', False),
+        ('SM', 'Selling & Marketing Expense', False),
+        ('OP', 'Operating Profit', True),
+        ('EBIT', 'EBIT', True),
+        ('EBITDA', 'EBITDA', True),
+        ('PBT', 'Profit Before Tax', False),
+        ('TP', 'Tax Provision', False),
+        ('NI', 'Net Income', True),
+        ('DA', 'Depreciation and Amortization', False),
+    ),
+    'cash_flow': (
+        ('CFFOA', 'Cash Flow From Operating Activities', True),
+        ('CFFIA', 'Cash Flow From Investing Activities', True),
+        ('CFFFA', 'Cash Flow From Financing Activities', True),
+        ('ECP', 'End Cash Position', False),
+        ('CIC', 'Changes in Cash', False),
+        ('EOERC', 'Effect of Exchange Rate Changes', False),
+        ('BCP', 'Beginning Cash Position', False),
+        ('CAPEX', 'CAPEX', True),
+    ),
+}
+
+# Karlılık tablosundaki yüzde değişim sütunu
+CHANGE_COLUMN = 'Change'
+
+# (symbol, content_hash, dil) -> hazır tablolar. content_hash veri değişince
+# değiştiğinden eski girdiler kendiliğinden kullanılmaz olur.
+statement_cache = TTLCache(
+    ttl=getattr(settings, 'STATEMENT_CACHE_TTL', 6 * 60 * 60),
+    maxsize=getattr(settings, 'STATEMENT_CACHE_SIZE', 256),
+)
+
+
+def format_value(value):
+    """Format one cell the way ``{{ value }}`` would in the template."""
+    if value is None:
+        return ''
+    return str(localize(value))
+
+
+def change_trend(value):
+    if not isinstance(value, (int, float)):
+        return 'missing'
+    if value > 0:
+        return 'up'
+    if value < 0:
+        return 'down'
+    return 'flat'
+
+
+def pivot(section, rows):
+    """Turn a ``{period: {key: value}}`` statement into a row x period matrix.
+
+    Returns ``{"periods": [...], "rows": [{"label", "bold", "cells"}]}``.
+    Each cell is ``{"text", "trend"}``; ``trend`` is only set in the
+    ``Change`` column and tells the template how to colour it.
+    """
+    section = section or {}
+    periods = list(section)
+    columns = list(section.values())
+    return {
+        'periods': periods,
+        'rows': [
+            {
+                'label': label,
+                'bold': bold,
+                'cells': [
+                    {
+                        'text': format_value(column.get(key)),
+                        'trend': change_trend(column.get(key)) if period == CHANGE_COLUMN else None,
+                    }
+                    for period, column in zip(periods, columns)
+                ],
+            }
+            for key, label, bold in rows
+        ],
+    }
+
+
+def build_statements(company):
+    return {name: pivot(company.get(name), rows) for name, rows in ROWS.items()}
+
+
+def get_statements(symbol, company):
+    """Pre-pivoted, pre-formatted statement tables for the profile page, cached per content hash."""
+    content_hash = company.get('content_hash')
+    if not content_hash:
+        return build_statements(company)
+    key = (symbol, content_hash, get_language())
+    return statement_cache.get_or_set(key, lambda: build_statements(company))
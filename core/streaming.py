@@ -0,0 +1,116 @@
+import asyncio
+import json
+import logging
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from .models import QuoteSnapshot
+from .quotes import QUOTE_TIMEOUT, fetch_last_prices
+
+logger = logging.getLogger(__name__)
+
+# Upstream'e kaç saniyede bir gidileceği; izleyici sayısından bağımsızdır
+STREAM_POLL_INTERVAL = getattr(settings, 'STREAM_POLL_INTERVAL', 15)
+# Bağlantının proxy'lerce kapatılmaması için boş yorum satırı aralığı
+STREAM_HEARTBEAT = getattr(settings, 'STREAM_HEARTBEAT', 20)
+STREAM_MAX_SYMBOLS = getattr(settings, 'STREAM_MAX_SYMBOLS', 50)
+# Yavaş istemcide biriken eski tikler atılır
+QUEUE_SIZE = 100
+
+
+def previous_closes(symbols):
+    return dict(QuoteSnapshot.objects.filter(company_id__in=symbols).values_list('company_id', 'previous_close'))
+
+
+class PriceHub:
+    """Fan-out of price ticks from one shared poller to every open stream.
+
+    Each stream subscribes with the symbols it shows. While at least one
+    stream is open a single task polls upstream for the union of those
+    symbols, so N viewers of a symbol cost one fetch per interval. Only
+    changed prices are published; a new subscriber gets the last known tick
+    straight away. All methods run on the event loop, so no locking is needed.
+    """
+
+    def __init__(self, interval=STREAM_POLL_INTERVAL, timeout=QUOTE_TIMEOUT):
+        self.interval = interval
+        self.timeout = timeout
+        self.polls = 0
+        self._subscribers = {}
+        self._last = {}
+        self._task = None
+
+    def subscribe(self, symbols):
+        queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        self._subscribers[queue] = set(symbols)
+        for symbol in symbols:
+            if symbol in self._last:
+                self._put(queue, self._last[symbol])
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        return queue
+
+    def unsubscribe(self, queue):
+        self._subscribers.pop(queue, None)
+
+    def symbols(self):
+        return set().union(*self._subscribers.values())
+
+    async def _run(self):
+        # Son izleyici ayrılınca poller kendiliğinden durur
+        while self._subscribers:
+            symbols = sorted(self.symbols())
+            try:
+                prices = await asyncio.wait_for(
+                    asyncio.to_thread(fetch_last_prices, symbols, self.timeout), self.timeout * 2,
+                )
+                closes = await sync_to_async(previous_closes)(symbols)
+            except Exception:
+                logger.exception("Price poll failed for %d symbols", len(symbols))
+            else:
+                self.polls += 1
+                self.publish(prices, closes)
+            await asyncio.sleep(self.interval)
+
+    def publish(self, prices, closes=None):
+        closes = closes or {}
+        for symbol, price in prices.items():
+            tick = {'symbol': symbol, **price}
+            previous_close = closes.get(symbol)
+            if previous_close:
+                tick['change'] = round(tick['price'] - previous_close, 2)
+                tick['change_pct'] = round((tick['price'] / previous_close - 1) * 100, 2)
+            if self._last.get(symbol) == tick:
+                continue
+            self._last[symbol] = tick
+            for queue, symbols in self._subscribers.items():
+                if symbol in symbols:
+                    self._put(queue, tick)
+
+    @staticmethod
+    def _put(queue, tick):
+        if queue.full():
+            queue.get_nowait()
+        queue.put_nowait(tick)
+
+
+hub = PriceHub()
+
+
+async def price_events(symbols, heartbeat=STREAM_HEARTBEAT):
+    """Server-Sent Events stream of ``tick`` events for ``symbols``."""
+    queue = hub.subscribe(symbols)
+    try:
+        yield 'retry: 5000\n\n'
+        while True:
+            try:
+                tick = await asyncio.wait_for(queue.get(), heartbeat)
+            except asyncio.TimeoutError:
+                yield ': keepalive\n\n'
+                continue
+            yield f'event: tick\ndata: {json.dumps(tick)}\n\n'
+    finally:
+        # İstemci bağlantıyı kapatınca (CancelledError) abonelik silinir
+        hub.unsubscribe(queue)
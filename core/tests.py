@@ -1,3 +1,190 @@
-from django.test import TestCase
+import asyncio
+import time
+from unittest import mock
 
-# Create your tests here.
+import pandas as pd
+from django.test import SimpleTestCase, TestCase
+
+from . import history
+from .cache import SingleFlight
+from .upstream import CircuitBreaker, UpstreamClient, UpstreamUnavailable
+
+
+class SingleFlightTests(SimpleTestCase):
+    async def test_cancelled_leader_releases_key(self):
+        flight = SingleFlight()
+        started, release = asyncio.Event(), asyncio.Event()
+
+        async def fetch():
+            started.set()
+            await release.wait()
+            return 'bars'
+
+        leader = asyncio.create_task(flight.ado('k', fetch))
+        await started.wait()
+        follower = asyncio.create_task(flight.ado('k', fetch))
+        await asyncio.sleep(0)
+
+        # İstemci bağlantıyı kesince Django view görevini iptal eder
+        leader.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await leader
+        self.assertTrue(flight.in_flight('k'))
+
+        release.set()
+        self.assertEqual(await asyncio.wait_for(follower, 1), 'bars')
+        self.assertFalse(flight.in_flight('k'))
+        self.assertEqual(await asyncio.wait_for(flight.ado('k', fetch), 1), 'bars')
+
+    async def test_cancelled_follower_does_not_cancel_call(self):
+        flight = SingleFlight()
+        release = asyncio.Event()
+
+        async def fetch():
+            await release.wait()
+            return 'bars'
+
+        leader = asyncio.create_task(flight.ado('k', fetch))
+        follower = asyncio.create_task(flight.ado('k', fetch))
+        await asyncio.sleep(0)
+        follower.cancel()
+        release.set()
+
+        self.assertEqual(await asyncio.wait_for(leader, 1), 'bars')
+        self.assertFalse(flight.in_flight('k'))
+
+    async def test_error_is_shared_and_key_released(self):
+        flight = SingleFlight()
+        release = asyncio.Event()
+
+        async def fetch():
+            await release.wait()
+            raise ValueError('upstream')
+
+        calls = [asyncio.create_task(flight.ado('k', fetch)) for _ in range(2)]
+        await asyncio.sleep(0)
+        release.set()
+
+        for call in calls:
+            with self.assertRaises(ValueError):
+                await asyncio.wait_for(call, 1)
+        self.assertFalse(flight.in_flight('k'))
+
+    def test_do_releases_key_on_base_exception(self):
+        flight = SingleFlight()
+
+        def interrupted():
+            raise KeyboardInterrupt
+
+        with self.assertRaises(KeyboardInterrupt):
+            flight.do('k', interrupted)
+        self.assertFalse(flight.in_flight('k'))
+        self.assertEqual(flight.do('k', lambda: 'bars'), 'bars')
+
+
+class CircuitBreakerTests(SimpleTestCase):
+    def setUp(self):
+        self.client = UpstreamClient(rate=1000, burst=1000, max_wait=0, retries=0, backoff=0,
+                                     failure_threshold=2, reset_timeout=0.05)
+        self.breaker = self.client.breaker
+
+    def fail(self):
+        raise ConnectionError('upstream')
+
+    def open_circuit(self):
+        for _ in range(2):
+            with self.assertRaises(ConnectionError):
+                self.client.call(self.fail)
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+
+    def test_opens_after_threshold_and_refuses(self):
+        with self.assertRaises(ConnectionError):
+            self.client.call(self.fail)
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+        with self.assertRaises(ConnectionError):
+            self.client.call(self.fail)
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+        with self.assertRaises(UpstreamUnavailable):
+            self.client.call(lambda: 'bars')
+
+    def test_half_open_trial_success_closes(self):
+        self.open_circuit()
+        time.sleep(0.06)
+        self.assertEqual(self.client.call(lambda: 'bars'), 'bars')
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+        self.assertEqual(self.breaker.failures, 0)
+
+    def test_half_open_trial_failure_reopens(self):
+        self.open_circuit()
+        time.sleep(0.06)
+        with self.assertRaises(ConnectionError):
+            self.client.call(self.fail)
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+        with self.assertRaises(UpstreamUnavailable):
+            self.client.call(lambda: 'bars')
+
+    def test_rate_limited_trial_is_handed_back(self):
+        self.open_circuit()
+        time.sleep(0.06)
+        self.client.bucket._tokens = 0
+        self.client.bucket.rate = 1e-9
+        with self.assertRaisesMessage(UpstreamUnavailable, 'rate limit'):
+            self.client.call(lambda: 'bars')
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+
+        # Kova dolunca sıradaki çağrı deneme olarak geçer
+        self.client.bucket.rate = 1000
+        time.sleep(0.01)
+        self.assertEqual(self.client.call(lambda: 'bars'), 'bars')
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_no_data_errors_are_not_failures(self):
+        attempts = []
+
+        def delisted():
+            attempts.append(1)
+            raise Exception('TYPO1.IS: No data found for this date range, symbol may be delisted')
+
+        client = UpstreamClient(rate=1000, burst=1000, max_wait=0, retries=2, backoff=0,
+                                failure_threshold=2, reset_timeout=60)
+        for _ in range(5):
+            with self.assertRaises(Exception):
+                client.call(delisted)
+        self.assertEqual(len(attempts), 5)
+        self.assertEqual(client.breaker.state, CircuitBreaker.CLOSED)
+        self.assertEqual(client.breaker.failures, 0)
+
+    def test_failed_history_call_counts_against_breaker(self):
+        class Ticker:
+            # yfinance gibi: raise_errors yoksa hata yutulur, boş frame döner
+            def __init__(self, symbol):
+                pass
+
+            def history(self, raise_errors=False, **kwargs):
+                if raise_errors:
+                    raise ConnectionError('Too Many Requests')
+                return pd.DataFrame()
+
+        with mock.patch('core.upstream.yf.Ticker', Ticker):
+            for _ in range(2):
+                with self.assertRaises(ConnectionError):
+                    self.client.history('ALARK.IS', period='5d')
+        self.assertEqual(self.breaker.failures, 2)
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+
+
+class SaveHistoryTests(TestCase):
+    def setUp(self):
+        history._synced.clear()
+
+    def test_empty_fetch_is_not_marked_synced(self):
+        self.assertEqual(history.save_history('X.IS', '1d', pd.DataFrame()), 0)
+        self.assertIsNone(history._synced.get(('X.IS', '1d')))
+
+    def test_written_bars_are_marked_synced(self):
+        frame = pd.DataFrame(
+            {'Open': [1.0], 'High': [1.0], 'Low': [1.0], 'Close': [1.0], 'Volume': [10]},
+            index=pd.DatetimeIndex(['2024-01-02'], tz='Europe/Istanbul'),
+        )
+        self.assertEqual(history.save_history('X.IS', '1d', frame), 1)
+        self.assertTrue(history._synced.get(('X.IS', '1d')))
@@ -0,0 +1,181 @@
+import logging
+import random
+import re
+import threading
+import time
+
+import yfinance as yf
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# yfinance history() hataları yutup boş frame döndürür; devre kesicinin
+# hataları görebilmesi için her zaman açılır. Ticker.history(*args, **kwargs)
+# imzasından görünmese de 0.2.28 ve sonrası bu parametreyi kabul ediyor.
+HISTORY_KWARGS = {'raise_errors': True}
+
+try:
+    from yfinance.exceptions import YFPricesMissingError, YFTzMissingError
+    NO_DATA_ERRORS = (YFPricesMissingError, YFTzMissingError)
+except ImportError:
+    # 0.2.28 bu durumlar için düz Exception fırlatıyor, mesajından tanınır
+    NO_DATA_ERRORS = ()
+
+NO_DATA_MESSAGE = re.compile(r"delisted|no (price )?data found|no timezone found|data doesn't exist", re.IGNORECASE)
+
+
+def is_no_data(error):
+    """Whether ``error`` means upstream answered but has no data for the symbol (unknown or delisted)."""
+    return isinstance(error, NO_DATA_ERRORS) or bool(NO_DATA_MESSAGE.search(str(error)))
+
+
+class UpstreamUnavailable(Exception):
+    """The upstream call was not attempted: circuit open or rate limit exceeded."""
+
+
+class TokenBucket:
+    """Thread-safe token bucket: ``rate`` tokens per second, at most ``capacity`` saved up."""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, timeout=0):
+        """Take one token, waiting up to ``timeout`` seconds. Returns False if none came free."""
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate
+            if now + wait > deadline:
+                return False
+            time.sleep(wait)
+
+
+class CircuitBreaker:
+    """Opens after ``failure_threshold`` consecutive failures.
+
+    While open every call is refused. After ``reset_timeout`` seconds one
+    trial call is let through (half-open); its success closes the circuit,
+    its failure opens it again.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+
+    def __init__(self, failure_threshold=5, reset_timeout=60):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self._opened_at = 0
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                return True
+            # Yarı açıkken deneme isteği sürerken diğerleri beklemeden reddedilir
+            return False
+
+    def release(self):
+        """Hand back a half-open trial that was never made (e.g. rate limited)."""
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                # _opened_at değişmez, sıradaki çağrı hemen deneme olabilir
+                self.state = self.OPEN
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    logger.warning("Upstream circuit opened after %d failures", self.failures)
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+
+    @property
+    def is_open(self):
+        return self.state == self.OPEN
+
+
+class UpstreamClient:
+    """Every yfinance call goes through here.
+
+    Calls are rate limited by a token bucket, retried with exponential
+    backoff and jitter, and refused outright with ``UpstreamUnavailable``
+    while the circuit breaker is open, so callers fall back to their
+    cached or stored data immediately instead of waiting out a timeout.
+    "No data for this symbol" answers are neither retried nor counted as
+    failures.
+    """
+
+    def __init__(self, rate=4, burst=20, max_wait=10, retries=2, backoff=0.5,
+                 failure_threshold=5, reset_timeout=60):
+        self.bucket = TokenBucket(rate, burst)
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self.max_wait = max_wait
+        self.retries = retries
+        self.backoff = backoff
+
+    def call(self, fn, *args, **kwargs):
+        for attempt in range(self.retries + 1):
+            if not self.breaker.allow():
+                raise UpstreamUnavailable("Upstream circuit is open")
+            if not self.bucket.acquire(self.max_wait):
+                self.breaker.release()
+                raise UpstreamUnavailable("Upstream rate limit exceeded")
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                if is_no_data(e):
+                    # Sembole özgü boş yanıt upstream arızası değildir: tekrar
+                    # denenmez ve devreyi açmaz, yoksa herkes upstream'i kilitleyebilir
+                    self.breaker.release()
+                    raise
+                self.breaker.record_failure()
+                if attempt == self.retries or self.breaker.is_open:
+                    raise
+                delay = self.backoff * 2 ** attempt
+                time.sleep(delay + random.uniform(0, delay))
+            else:
+                self.breaker.record_success()
+                return result
+
+    def history(self, symbol, **kwargs):
+        return self.call(lambda: yf.Ticker(symbol).history(**HISTORY_KWARGS, **kwargs))
+
+    def info(self, symbol):
+        return self.call(lambda: yf.Ticker(symbol).info)
+
+    def download(self, symbols, **kwargs):
+        return self.call(yf.download, symbols, **kwargs)
+
+
+yahoo = UpstreamClient(
+    rate=getattr(settings, 'UPSTREAM_RATE', 4),
+    burst=getattr(settings, 'UPSTREAM_BURST', 20),
+    max_wait=getattr(settings, 'UPSTREAM_MAX_WAIT', 10),
+    retries=getattr(settings, 'UPSTREAM_RETRIES', 2),
+    backoff=getattr(settings, 'UPSTREAM_BACKOFF', 0.5),
+    failure_threshold=getattr(settings, 'UPSTREAM_FAILURE_THRESHOLD', 5),
+    reset_timeout=getattr(settings, 'UPSTREAM_RESET_TIMEOUT', 60),
+)
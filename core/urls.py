@@ -8,5 +8,12 @@ urlpatterns = [
     path('marketcap/', views.marketcap, name='marketcap'),
     path('profile/<str:symbol>/', views.profile, name='profile'),
     path('datatables/', views.datatables_improved, name='datatables'),
+    path('screener/', views.screener, name='screener'),
+    path('api/datatables/', views.get_datatables_data, name='datatables_data'),
+    path('api/screener/', views.get_screener_data, name='screener_data'),
+    path('api/symbols/', views.get_symbols, name='symbols'),
+    path('api/analytics/', views.get_analytics_data, name='analytics_data'),
     path('api/stock-data/<str:symbol>/', views.get_stock_data_ajax, name='stock_data_ajax'),
+    path('api/stream/prices/', views.stream_prices, name='stream_prices'),
+    path('api/chart-data/<str:symbol>/', views.get_chart_data, name='chart_data'),
 ]
\ No newline at end of file
@@ -1,11 +1,34 @@
+import asyncio
+import hashlib
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
 from django.shortcuts import render
-from django.http import JsonResponse
-import yfinance as yf
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
 import pandas as pd
 import plotly.graph_objects as go
 from plotly.io import to_html
 from datetime import datetime, timedelta
-from .models import Company
+from zoneinfo import ZoneInfo
+from .analytics import ANALYTICS_BENCHMARK, analytics
+from .cache import figure_cache
+from .chart_data import ENCODINGS, downsample, encode_series
+from .companies import SECTIONS, get_company_data
+from .datatables import query_table
+from . import fragments
+from .financials import net_debt_changes, period_label
+from .history import BAR_LENGTH, PERIODS, aensure_history, aget_history, last_bar, load_period, market_timezone
+from .indicators import label as indicator_label, parse_indicators, serialize as serialize_indicator, symbol_indicators
+from .models import CompanyProfile, QuoteSnapshot
+from .quotes import PROFILE_FIELDS, QUOTE_FIELDS, empty_quote, extract_profile
+from .registry import registry
+from .screener import fields as screener_fields, screen
+from .statements import get_statements
+from .streaming import STREAM_MAX_SYMBOLS, price_events
 import json
 
 def format_market_cap(market_cap):
@@ -52,76 +75,122 @@ def format_total_debt(total_debt):
         return "{:.2f}B".format(billion_value)
 
 
-def marketcap(request):
+async def marketcap(request):
 
-    symbols = ["ARCLK.IS", "ALARK.IS", "ASELS.IS", "ASTOR.IS", "BIMAS.IS", "BRSAN.IS", "EKGYO.IS", "ENKAI.IS", "EREGL.IS", "FROTO.IS","GUBRF.IS", "HEKTS.IS", "KCHOL.IS", "KONTR.IS", "KOZAL.IS", "KRDMD.IS", "ODAS.IS", "OYAKC.IS", "PETKM.IS", "PGSUS.IS", "SAHOL.IS", "SASA.IS", "SISE.IS", "TCELL.IS", "THYAO.IS", "TOASO.IS", "TUPRS.IS"]
+    # Semboller Company tablosundan, bellekteki kayıt defterinden gelir
+    symbols = await sync_to_async(registry.symbols)()
+    registry_revision = await sync_to_async(registry.revision)()
     
-    stock_data = {}
-
-    for symbol in symbols:
-        ticker = yf.Ticker(symbol)
-
-        #current price
-        current_price = ticker.history(period="1d")["Close"].iloc[-1]
-
-        high_52w = ticker.info["fiftyTwoWeekHigh"]
-        low_52w = ticker.info["fiftyTwoWeekLow"]
-
-        market_cap = ticker.info["marketCap"]
-
-        # PE Ratio
-        pe_ratio = ticker.info.get("trailingPE")
-        if pe_ratio is not None:
-            pe_ratio = float(pe_ratio)
-            pe_ratio = "{:.2f}".format(pe_ratio)
-
-        enterprise_value = ticker.info.get("enterpriseValue")
-        ebitda = ticker.info.get("ebitda")
-
-        ev_ebitda = None
-        if enterprise_value is not None and ebitda is not None and ebitda != 0:
-            ev_ebitda = enterprise_value / ebitda
-
-        free_cash_flow = ticker.info.get("freeCashflow")
-
-        total_debt = ticker.info.get("totalDebt")
+    # Veriler refresh_market_data komutu tarafından güncellenir, istek sırasında upstream'e gidilmez
+    snapshots = {
+        row.pop("company_id"): row
+        async for row in QuoteSnapshot.objects.filter(company_id__in=symbols).values("company_id", "updated_at", *QUOTE_FIELDS)
+    }
+    # En son yazılan fiyat anı; refresh_market_data başka bir süreçte çalışsa da
+    # tablo parçasının anahtarı veriyle birlikte değişir
+    quotes_revision = max((row.pop("updated_at").timestamp() for row in snapshots.values()), default=None)
+    stock_data = {symbol: snapshots.get(symbol) or empty_quote() for symbol in symbols}
 
-        stock_data[symbol] = {
-            "current_price": current_price,
-            "market_cap": market_cap,
-            "high_52w": high_52w,
-            "low_52w": low_52w,
-            "pe_ratio": pe_ratio,
-            "ev_ebitda": ev_ebitda,
-            "free_cash_flow": free_cash_flow,
-            "total_debt": total_debt
-        }
-        
-        formatted_stock_data = {
+    formatted_stock_data = {
         symbol: {
             "current_price": data["current_price"],
             "market_cap": format_market_cap(data["market_cap"]),
             "high_52w": data["high_52w"],
             "low_52w": data["low_52w"],
-            "pe_ratio": data["pe_ratio"],
+            "pe_ratio": "{:.2f}".format(data["pe_ratio"]) if data["pe_ratio"] is not None else None,
             "ev_ebitda": "{:.2f}".format(data["ev_ebitda"]) if data["ev_ebitda"] is not None else None, #format the data
             "free_cash_flow": format_free_cash_flow(data["free_cash_flow"]), #format the data
             "total_debt": format_total_debt(data["total_debt"]),
         }
         for symbol, data in stock_data.items()
     }
-    return render(request, 'marketcap.html', {'stock_data': formatted_stock_data})
-
-def retrieve_stock_data(ticker: str, start_date: str = "2020-01-01", end_date: str = datetime.now().strftime("%Y-%m-%d")):
-    ticker_info = ticker.info
-    
-    start_date = datetime.strptime(start_date, "%Y-%m-%d")
-    end_date = datetime.strptime(end_date, "%Y-%m-%d")
-    
-    hist_df = ticker.history(start=start_date, end=end_date)
-    hist_df = hist_df.reset_index()
+    return render(request, 'marketcap.html', {
+        'stock_data': formatted_stock_data,
+        'fragment_ttl': fragments.FRAGMENT_CACHE_TTL,
+        # Şirket eklenip silinince ya da fiyatlar yenilenince tablo parçası da yenilenir
+        'fragment_revision': await sync_to_async(fragments.revision)(None, registry_revision, quotes_revision),
+    })
+
+def build_ratio_data(quote):
+    """Valuation ratios for the profile page, computed from a QuoteSnapshot (or None)."""
+    def rounded(value, scale=1):
+        return round(value * scale, 2) if value is not None else "N/A"
+
+    def ratio(numerator, denominator):
+        if numerator is None or not denominator:
+            return "N/A"
+        return round(numerator / denominator, 2)
+
+    if quote is None:
+        quote = QuoteSnapshot()
+
+    cash_to_marketcap = None
+    if quote.total_cash and quote.market_cap:
+        cash_to_marketcap = round(quote.total_cash / quote.market_cap, 2)
+
+    return {
+        "pe_ratio": rounded(quote.pe_ratio),
+        "price_to_book": rounded(quote.price_to_book),
+        "ev_ebitda": rounded(quote.ev_ebitda),
+        "ebitda": rounded(quote.ebitda),
+        "ev_fcff": ratio(quote.enterprise_value, quote.free_cash_flow),
+        "roa": rounded(quote.roa, 100),
+        "roe": rounded(quote.roe, 100),
+        "current_ratio": rounded(quote.current_ratio),
+        "quick_ratio": rounded(quote.quick_ratio),
+        "total_debt_to_fcf": ratio(quote.total_debt, quote.free_cash_flow),
+        "cash_market_cap": cash_to_marketcap,
+    }
 
-    return hist_df, ticker_info
+LINE_CHART_HTML = {
+    "full_html": False,
+    "include_plotlyjs": "cdn",
+    "config": {
+        'responsive': True,
+        'displayModeBar': False,
+        'scrollZoom': True,
+        'doubleClick': 'reset+autosize',
+        'showTips': False,
+        'editable': False,
+        'staticPlot': False
+    },
+}
+
+NET_DEBT_CHART_HTML = {
+    "full_html": False,
+    "include_plotlyjs": "cdn",
+    "config": {
+        'responsive': True,
+        'displayModeBar': False,
+        'scrollZoom': False,
+        'doubleClick': 'reset+autosize'
+    },
+}
+
+async def retrieve_stock_data(symbol: str, start_date: str = "2020-01-01", end_date: str = None):
+    """Daily bars for ``symbol`` as one frame, shared by everything on the profile page."""
+    tz = ZoneInfo(market_timezone())
+    start_date = datetime.strptime(start_date, "%Y-%m-%d").replace(tzinfo=tz)
+    if end_date is not None:
+        end_date = datetime.strptime(end_date, "%Y-%m-%d").replace(tzinfo=tz)
+
+    # Barlar yerel tablodan okunur, upstream'den yalnızca yeni barlar çekilir
+    return await aget_history(symbol, '1d', start=start_date, end=end_date)
+
+def history_revision(hist_df: pd.DataFrame):
+    """Identifies the data behind a price chart: bar count plus the last bar."""
+    if hist_df.empty:
+        return "empty"
+    last = hist_df.iloc[-1]
+    return f"{len(hist_df)}:{last['Date'].isoformat()}:{last['Close']}"
+
+def calculate_price_change(hist_df: pd.DataFrame):
+    """Last close minus the previous one, absolute and in percent."""
+    closes = hist_df["Close"].values
+    if len(closes) < 2 or not closes[-2]:
+        return 0, 0
+    change = closes[-1] - closes[-2]
+    return round(change, 2), round(change / closes[-2] * 100, 2)
 
 def create_line_chart(hist_df: pd.DataFrame, symbol=None, dark_mode=False):
     # Define colors based on theme
@@ -146,6 +215,9 @@ def create_line_chart(hist_df: pd.DataFrame, symbol=None, dark_mode=False):
         spike_color = 'rgba(102, 126, 234, 0.6)'
         hover_bg = 'rgba(102, 126, 234, 0.9)'
 
+    # Grafik genişliğinden fazla nokta çizmenin faydası yok
+    hist_df = downsample(hist_df, getattr(settings, 'CHART_MAX_POINTS', 300))
+
     fig = go.Figure(data=[
         go.Scatter(
             x=hist_df['Date'],
@@ -221,399 +293,217 @@ def create_line_chart(hist_df: pd.DataFrame, symbol=None, dark_mode=False):
 
     return fig
 
-def get_cash_flow_data(symbol):
-    try:
-        company_obj = Company.objects.get(symbol=symbol)
-        cash_flow_data = company_obj.cash_flow
-        return cash_flow_data
-    
-    except Company.DoesNotExist:
-        return None
-    
-def get_income_statement_data(symbol):
-    try:
-        company_obj = Company.objects.get(symbol=symbol)
-        income_statement_data = company_obj.income_statement
-        return income_statement_data
-    
-    except Company.DoesNotExist:
-        return None
-    
-def get_balance_sheet_data(symbol):
-    try:
-        company_obj = Company.objects.get(symbol=symbol)
-        balance_sheet_data = company_obj.balance_sheet
-        return balance_sheet_data
-    
-    except Company.DoesNotExist:
-        return None
-    
-def get_profitability_data(symbol):
-    try:
-        company_obj = Company.objects.get(symbol=symbol)
-        profitability_data = company_obj.profitability
-        return profitability_data
-    
-    except Company.DoesNotExist:
-        return None
-    
-def get_stock_name(symbol):
-    company_obj = Company.objects.get(symbol=symbol)
-    stock_name = company_obj.name
-    return stock_name
-    
 def generate_net_debt_change_chart(symbol, dark_mode=False):
-    # Sembole göre finansal verileri çek
-    ticker = yf.Ticker(symbol)
-    
-    try:
-        # Bilanço tablosunu al
-        balance_sheet_annual = ticker.balance_sheet
-        # DataFrame oluştur
-        df_balance_sheet = pd.DataFrame(balance_sheet_annual)
-        
-        # Gerekli verileri seç
-        required_values = ['Total Debt', 'Cash And Cash Equivalents', 'Other Short Term Investments']
-        
-        # Anahtarların veri setinde olup olmadığını kontrol et
-        if 'Other Short Term Investments' not in df_balance_sheet.index:
-            required_values.remove('Other Short Term Investments')
-        
-        # Seçilen verileri bir önceki yılın verileriyle birleştir
-        selected_data = df_balance_sheet.loc[required_values].T
-        
-        # Tarih aralığını oluştur
-        dates = pd.date_range('2020-12-31', '2023-12-31', freq='Y')
-        
-        # Seçilen verileri belirtilen tarih aralığına göre filtrele
-        selected_data = selected_data[selected_data.index.isin(dates)]
-        
-        # Farkları içeren bir DataFrame oluştur
-        percentage_change_df = pd.DataFrame(columns=['2021', '2022', '2023'])
-        
-        if '2020-12-31' in selected_data.index and '2021-12-31' in selected_data.index:
-            percentage_change_2021_2020 = (selected_data.loc['2021-12-31'] / selected_data.loc['2020-12-31'] - 1) * 100
-            percentage_change_df['2021'] = percentage_change_2021_2020
-        
-        if '2021-12-31' in selected_data.index and '2022-12-31' in selected_data.index:
-            percentage_change_2022_2021 = (selected_data.loc['2022-12-31'] / selected_data.loc['2021-12-31'] - 1) * 100
-            percentage_change_df['2022'] = percentage_change_2022_2021
-        
-        if '2022-12-31' in selected_data.index and '2023-12-31' in selected_data.index:
-            percentage_change_2023_2022 = (selected_data.loc['2023-12-31'] / selected_data.loc['2022-12-31'] - 1) * 100
-            percentage_change_df['2023'] = percentage_change_2023_2022
-            
-        # Finansal kalemleri ayrı sütunlar olarak ayır
-        separated_df = pd.DataFrame()
-            
-        for index in percentage_change_df.index:
-            separated_df[index] = percentage_change_df.loc[index]
-            
+    # Kayıtlı bilanço kalemlerinden dönemsel % değişim (tüm yıllar, vektörel)
+    changes = net_debt_changes([symbol])
+    if not changes.empty:
+        changes = changes.loc[symbol]
 
-        
-        fig = go.Figure()
-        
-        # Define colors based on theme
-        if dark_mode:
-            colors = [
-                "rgba(139, 92, 246, 0.8)",   # Purple
-                "rgba(251, 191, 36, 0.8)",   # Amber
-                "rgba(34, 197, 94, 0.8)"     # Green
-            ]
-            hover_colors = [
-                "rgba(139, 92, 246, 1.0)",
-                "rgba(251, 191, 36, 1.0)", 
-                "rgba(34, 197, 94, 1.0)"
-            ]
-            plot_bg = 'rgba(17, 24, 39, 0.6)'
-            paper_bg = 'rgba(31, 41, 55, 1)'
-            text_color = '#F9FAFB'
-            grid_color = 'rgba(75, 85, 99, 0.3)'
-            line_color = 'rgba(75, 85, 99, 0.6)'
-            legend_bg = 'rgba(55, 65, 81, 0.9)'
-            legend_border = 'rgba(75, 85, 99, 0.5)'
-        else:
-            colors = [
-                "rgba(102, 126, 234, 0.8)",   # Primary blue
-                "rgba(245, 184, 73, 0.8)",    # Warm orange  
-                "rgba(34, 197, 94, 0.8)"      # Fresh green
-            ]
-            hover_colors = [
-                "rgba(102, 126, 234, 1.0)",
-                "rgba(245, 184, 73, 1.0)", 
-                "rgba(34, 197, 94, 1.0)"
-            ]
-            plot_bg = 'rgba(248, 250, 252, 0.4)'
-            paper_bg = 'white'
-            text_color = '#374151'
-            grid_color = 'rgba(156, 163, 175, 0.2)'
-            line_color = 'rgba(156, 163, 175, 0.5)'
-            legend_bg = 'rgba(255, 255, 255, 0.8)'
-            legend_border = 'rgba(156, 163, 175, 0.3)'
-            
-        for i, column in enumerate(separated_df.columns):
-            fig.add_trace(go.Bar(
-                x=[f"202{i+1}" for i in range(len(separated_df))], 
-                y=separated_df[column], 
-                name=column,
-                marker=dict(
-                    color=colors[i],
-                    line=dict(color=hover_colors[i], width=2),
-                    cornerradius=8
-                ),
-                text=[f"{val:.1f}%" for val in separated_df[column]],
-                textposition='auto',
-                textfont=dict(
-                    size=12,
-                    color="white",
-                    family="Inter, sans-serif"
-                ),
-                hovertemplate='<b>%{fullData.name}</b><br>' +
-                             '<b>Year:</b> %{x}<br>' +
-                             '<b>Change:</b> %{y:.1f}%<br>' +
-                             '<extra></extra>',
-                hoverlabel=dict(
-                    bgcolor=hover_colors[i],
-                    bordercolor="white",
-                    font_color="white"
-                ),
-                showlegend=True
-            ))
-            
-        fig.update_layout(
-            title='',
-            autosize=True,
-            plot_bgcolor=plot_bg,
-            paper_bgcolor=paper_bg,
-            barmode='group',
-            bargap=0.15,
-            bargroupgap=0.1,
-            font=dict(
-                family="Inter, -apple-system, BlinkMacSystemFont, sans-serif",
+    fig = go.Figure()
+
+    # Define colors based on theme
+    if dark_mode:
+        colors = [
+            "rgba(139, 92, 246, 0.8)",   # Purple
+            "rgba(251, 191, 36, 0.8)",   # Amber
+            "rgba(34, 197, 94, 0.8)"     # Green
+        ]
+        hover_colors = [
+            "rgba(139, 92, 246, 1.0)",
+            "rgba(251, 191, 36, 1.0)", 
+            "rgba(34, 197, 94, 1.0)"
+        ]
+        plot_bg = 'rgba(17, 24, 39, 0.6)'
+        paper_bg = 'rgba(31, 41, 55, 1)'
+        text_color = '#F9FAFB'
+        grid_color = 'rgba(75, 85, 99, 0.3)'
+        line_color = 'rgba(75, 85, 99, 0.6)'
+        legend_bg = 'rgba(55, 65, 81, 0.9)'
+        legend_border = 'rgba(75, 85, 99, 0.5)'
+    else:
+        colors = [
+            "rgba(102, 126, 234, 0.8)",   # Primary blue
+            "rgba(245, 184, 73, 0.8)",    # Warm orange  
+            "rgba(34, 197, 94, 0.8)"      # Fresh green
+        ]
+        hover_colors = [
+            "rgba(102, 126, 234, 1.0)",
+            "rgba(245, 184, 73, 1.0)", 
+            "rgba(34, 197, 94, 1.0)"
+        ]
+        plot_bg = 'rgba(248, 250, 252, 0.4)'
+        paper_bg = 'white'
+        text_color = '#374151'
+        grid_color = 'rgba(156, 163, 175, 0.2)'
+        line_color = 'rgba(156, 163, 175, 0.5)'
+        legend_bg = 'rgba(255, 255, 255, 0.8)'
+        legend_border = 'rgba(156, 163, 175, 0.3)'
+
+    # x ekseni: dönemler, her kalem ayrı bir bar serisi
+    labels = [period_label(period_end) for period_end in changes.index]
+    for i, column in enumerate(changes.columns):
+        values = changes[column]
+        fig.add_trace(go.Bar(
+            x=labels, 
+            y=values, 
+            name=column,
+            marker=dict(
+                color=colors[i],
+                line=dict(color=hover_colors[i], width=2),
+                cornerradius=8
+            ),
+            text=[f"{val:.1f}%" if pd.notna(val) else "" for val in values],
+            textposition='auto',
+            textfont=dict(
                 size=12,
-                color=text_color
+                color="white",
+                family="Inter, sans-serif"
             ),
-            margin=dict(l=20, r=20, t=20, b=40),
-            legend=dict(
-                orientation="h",
-                yanchor="bottom",
-                y=-0.15,
-                xanchor="center",
-                x=0.5,
-                bgcolor=legend_bg,
-                bordercolor=legend_border,
-                borderwidth=1,
-                font=dict(size=11, color=text_color)
+            hovertemplate='<b>%{fullData.name}</b><br>' +
+                         '<b>Year:</b> %{x}<br>' +
+                         '<b>Change:</b> %{y:.1f}%<br>' +
+                         '<extra></extra>',
+            hoverlabel=dict(
+                bgcolor=hover_colors[i],
+                bordercolor="white",
+                font_color="white"
             ),
-            hovermode='x unified',
-            transition_duration=300
-        )
-            
-        fig.for_each_trace(lambda trace: trace.update(name=trace.name.replace('Total Debt', 'Financial Debt')))
-            
-        fig.update_xaxes(
-            showline=True, 
-            linewidth=1, 
-            linecolor=line_color,
-            showgrid=True,
-            gridcolor=grid_color,
-            tickfont=dict(size=11, color=text_color),
-            title_font=dict(size=12, color=text_color)
-        )
-        
-        fig.update_yaxes(
-            showline=True, 
-            linewidth=1, 
-            linecolor=line_color,
-            showgrid=True,
-            gridcolor=grid_color,
-            tickfont=dict(size=11, color=text_color),
-            title_font=dict(size=12, color=text_color),
-            ticksuffix="%",
-            zeroline=True,
-            zerolinecolor=line_color,
-            zerolinewidth=2
-        )
+            showlegend=True
+        ))
         
-    except KeyError:
-        print("Veri setinde beklenmeyen bir anahtar bulundu.")
-        return None
-
-    return fig
-
+    fig.update_layout(
+        title='',
+        autosize=True,
+        plot_bgcolor=plot_bg,
+        paper_bgcolor=paper_bg,
+        barmode='group',
+        bargap=0.15,
+        bargroupgap=0.1,
+        font=dict(
+            family="Inter, -apple-system, BlinkMacSystemFont, sans-serif",
+            size=12,
+            color=text_color
+        ),
+        margin=dict(l=20, r=20, t=20, b=40),
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=-0.15,
+            xanchor="center",
+            x=0.5,
+            bgcolor=legend_bg,
+            bordercolor=legend_border,
+            borderwidth=1,
+            font=dict(size=11, color=text_color)
+        ),
+        hovermode='x unified',
+        transition_duration=300
+    )
 
+    fig.for_each_trace(lambda trace: trace.update(name=trace.name.replace('Total Debt', 'Financial Debt')))
 
-def profile(request, symbol):
-    stocks = {
-        "ARCLK.IS": "ARCLK", "ALARK.IS": "ALARK", "ASELS.IS": "ASELS", "ASTOR.IS": "ASTOR", "BIMAS.IS": "BIMAS", "BRSAN.IS": "BRSAN","EKGYO.IS": "EKGYO",
-        "ENKAI.IS": "ENKAI","EREGL.IS": "EREGL", "FROTO.IS": "FROTO","GUBRF.IS": "GUBRF","HEKTS.IS": "HEKTS","KCHOL.IS": "KCHOL","KONTR.IS": "KONTR", 
-        "KOZAL.IS": "KOZAL","KRDMD.IS": "KRDMD","ODAS.IS": "ODAS","OYAKC.IS": "OYAKC","PETKM.IS": "PETKM",
-        "PGSUS.IS": "PGSUS","SAHOL.IS": "SAHOL","SASA.IS": "SASA","SISE.IS": "SISE", 
-        "TCELL.IS": "TCELL","THYAO.IS": "THYAO","TOASO.IS": "TOASO","TUPRS.IS": "TUPRS",
-    }
+    fig.update_xaxes(
+        showline=True, 
+        linewidth=1, 
+        linecolor=line_color,
+        showgrid=True,
+        gridcolor=grid_color,
+        tickfont=dict(size=11, color=text_color),
+        title_font=dict(size=12, color=text_color)
+    )
 
-    stock_data = {}
+    fig.update_yaxes(
+        showline=True, 
+        linewidth=1, 
+        linecolor=line_color,
+        showgrid=True,
+        gridcolor=grid_color,
+        tickfont=dict(size=11, color=text_color),
+        title_font=dict(size=12, color=text_color),
+        ticksuffix="%",
+        zeroline=True,
+        zerolinecolor=line_color,
+        zerolinewidth=2
+    )
 
-    label = stocks.get(symbol)
 
-    if label:
-        ticker = yf.Ticker(symbol)
+    return fig
 
-        pe_ratio = ticker.info.get("trailingPE", "N/A")
-        price_to_book = ticker.info.get("priceToBook", "N/A")
 
-        enterprise_value = ticker.info.get("enterpriseValue", "N/A")
-        ebitda = ticker.info.get("ebitda", "N/A")
-        enterpriseToEbitda = ticker.info.get("enterpriseToEbitda", "N/A")
 
-        ev_fcff = None
-        free_cash_flow = ticker.info.get("freeCashflow", "N/A")
-        if enterprise_value != "N/A" and free_cash_flow != "N/A":
-            ev_fcff = round(enterprise_value / free_cash_flow, 2)
-        else:
-            ev_fcff = "N/A"
-            
-        roa = ticker.info.get("returnOnAssets", "N/A")
-        roe = ticker.info.get("returnOnEquity", "N/A")
-        current_ratio = ticker.info.get("currentRatio", "N/A")
-        quick_ratio = ticker.info.get("quickRatio", "N/A")
+def detect_dark_mode(request):
+    """Dark mode preference from the session, cookies or a theme header."""
+    return (
+        request.session.get('dark_mode') == 'true' or
+        request.COOKIES.get('dark_mode') == 'true' or
+        request.COOKIES.get('theme') == 'dark' or
+        request.session.get('theme') == 'dark' or
+        request.META.get('HTTP_THEME') == 'dark'
+    )
 
-        total_debt = ticker.info.get("totalDebt", "N/A")
-        total_debt_to_fcf = None
-    
-        # total_debt and free_cash_flow convert to float
-        try:
-            total_debt = float(total_debt)
-            free_cash_flow = float(free_cash_flow)
-        except (TypeError, ValueError):
-        #excepting errors
-            total_debt = None
-            free_cash_flow = None
-
-        # total_debt_to_fcf calculation
-        if total_debt is not None and free_cash_flow is not None:
-            total_debt_to_fcf = round(total_debt / free_cash_flow, 2)
-        else:
-            total_debt_to_fcf = "N/A" 
-
-        marketcap = ticker.info.get("marketCap", "N/A")
-        total_cash = ticker.info.get("totalCash", "N/A")
-        cash_to_marketcap = None
-        if total_cash and marketcap:
-            cash_to_marketcap = round(total_cash / marketcap, 2)
-        
-        #details about company
-        company_info = ticker.info
-        address = company_info.get("address2")
-        city = company_info.get("city")
-        country = company_info.get("country")
-        sector = company_info.get("sector")
-        industry = company_info.get("industry")
-        phone = company_info.get("phone")
-        website = company_info.get("website")
-        long_name = company_info.get("longName")
-
-        long_description = company_info.get("longBusinessSummary")
-
-        company_officers = ticker.info.get("companyOfficers", [])
-        ceo = "N/A"
-        cfo = "N/A"
-
-        # Detect dark mode from various sources
-        dark_mode = (
-            request.session.get('dark_mode') == 'true' or
-            request.COOKIES.get('dark_mode') == 'true' or
-            request.COOKIES.get('theme') == 'dark' or
-            request.session.get('theme') == 'dark' or
-            request.META.get('HTTP_THEME') == 'dark'
-        )
-        
-        # Get stock data for chart
-        hist_df_tl, info = retrieve_stock_data(ticker)
-        linechart_fig = create_line_chart(hist_df_tl, symbol, dark_mode)
-        
-        # Get basic price data for change calculation  
-        hist_df_basic = yf.download(symbol, start="2020-01-01", end=datetime.now().strftime("%Y-%m-%d"))
-
-        chart_div = to_html(
-            linechart_fig, 
-            full_html=False, 
-            include_plotlyjs="cdn",
-            config={
-                'responsive': True,
-                'displayModeBar': False,
-                'scrollZoom': True,
-                'doubleClick': 'reset+autosize',
-                'showTips': False,
-                'editable': False,
-                'staticPlot': False
-            }
-        )
-        p1, p2 = hist_df_basic["Close"].values[-1], hist_df_basic["Close"].values[-2]
-        change, prcnt_change = (p2-p1), (p2-p1) / p1
-        columnchart_fig = generate_net_debt_change_chart(symbol, dark_mode)
-        chart_netdebt_div = to_html(
-            columnchart_fig, 
-            full_html=False, 
-            include_plotlyjs="cdn",
-            config={
-                'responsive': True,
-                'displayModeBar': False,
-                'scrollZoom': False,
-                'doubleClick': 'reset+autosize'
-            }
+def render_profile_charts(symbol, hist_df, company, dark_mode):
+    """Price and net-debt chart HTML for the profile page (from the figure cache when possible)."""
+    # Aynı sembol/tema/veri için grafikler yeniden oluşturulmaz.
+    # İstemci tarafı modda fiyat serisi sayfaya gömülmez, /api/chart-data/'dan yüklenir.
+    chart_div = None
+    if not getattr(settings, 'PRICE_CHART_CLIENT_SIDE', True):
+        chart_div = figure_cache.get_or_render(
+            symbol, "price", dark_mode, history_revision(hist_df),
+            lambda: to_html(create_line_chart(hist_df, symbol, dark_mode), **LINE_CHART_HTML),
         )
+    chart_netdebt_div = figure_cache.get_or_render(
+        symbol, "net_debt", dark_mode, company.get("content_hash"),
+        lambda: to_html(generate_net_debt_change_chart(symbol, dark_mode), **NET_DEBT_CHART_HTML),
+    )
+    return chart_div, chart_netdebt_div
 
-        cash_flow= get_cash_flow_data(symbol)
-        income_data = get_income_statement_data(symbol)
-        balance_data = get_balance_sheet_data(symbol)
-        profitability_data = get_profitability_data(symbol)
-        stock_name = get_stock_name(symbol)
+async def profile(request, symbol):
+    entry = await sync_to_async(registry.get)(symbol)
 
+    stock_data = {}
+
+    if entry:
+        # Fiyat ve şirket bilgileri refresh_market_data komutunun yazdığı tablolardan okunur.
+        # Fiyat geçmişi yalnızca grafik sunucuda çiziliyorsa okunur; istemci tarafı
+        # modda grafik /api/chart-data/'dan yüklenir, ilk boyama indirmeyi beklemez
+        client_side = getattr(settings, 'PRICE_CHART_CLIENT_SIDE', True)
+        quote, company_profile, company, hist_df, dark_mode = await asyncio.gather(
+            QuoteSnapshot.objects.filter(company_id=symbol).afirst(),
+            CompanyProfile.objects.filter(company_id=symbol).values("updated_at", *PROFILE_FIELDS).afirst(),
+            # Şirketin tüm tabloları tek sorguyla (ve önbellekten) okunur
+            sync_to_async(get_company_data)(symbol),
+            asyncio.sleep(0) if client_side else retrieve_stock_data(symbol),
+            sync_to_async(detect_dark_mode)(request),
+        )
+        profile_revision = company_profile.pop("updated_at").timestamp() if company_profile else None
+        company_profile = company_profile or extract_profile({})
+        company = company or dict.fromkeys(SECTIONS)
 
-        for officer in company_officers:
-            title = officer.get("title", "").lower()  # Unvanı küçük harfe dönüştür
-            if "ceo" in title or "chief executive" in title or "gm" in title or "general manager" in title:
-                ceo = officer.get("name", "N/A")
-            elif "cfo" in title or "chief financial" in title or "head of financial" in title or "director of finance" in title or "financial director":
-                cfo = officer.get("name", "N/A")
+        chart_div, chart_netdebt_div = await sync_to_async(render_profile_charts)(symbol, hist_df, company, dark_mode)
+        # Şirket bilgisi, tablolar ve net borç grafiği {% cache %} ile saklanır;
+        # revizyon tabloların içerik özeti ve profilin yazıldığı andan türetilir,
+        # böylece başka süreçteki importer/refresher güncellemeleri de görülür
+        fragment_revision = await sync_to_async(fragments.revision)(symbol, company.get("content_hash"), profile_revision)
 
         stock_data = {
-            "pe_ratio": round(float(pe_ratio), 2) if pe_ratio != "N/A" else pe_ratio,
-            "price_to_book": round(price_to_book, 2) if price_to_book != "N/A" else price_to_book,
-            "ev_ebitda": round(enterpriseToEbitda, 2) if enterpriseToEbitda != "N/A" else enterpriseToEbitda,
-            "ebitda": round(ebitda, 2) if ebitda != "N/A" else ebitda,
-            "ev_fcff": ev_fcff,
-            "roa": round(roa * 100, 2) if isinstance(roa, float) else roa,
-            "roe": round(roe * 100, 2) if isinstance(roe, float) else roe,
-            "current_ratio": round(current_ratio, 2) if current_ratio != "N/A" else current_ratio,
-            "quick_ratio": round(quick_ratio, 2) if quick_ratio != "N/A" else quick_ratio,
-            "total_debt_to_fcf": total_debt_to_fcf,
-            "cash_market_cap": cash_to_marketcap,
-
-            
-            "address": address,
-            "city": city,
-            "country": country,
-            "phone": phone,
-            "website": website,
-            "long_name": long_name,
-            "long_description": long_description,
-            "sector": sector,
-            "industry": industry,
-            "ceo": ceo,
-            "cfo": cfo,
+            **build_ratio_data(quote),
+            **company_profile,
+            "current_price": quote.current_price if quote else None,
             "chart_div": chart_div,
             "chart_netdebt_div": chart_netdebt_div,
-            "cash_flow": cash_flow,
-            "income_data": income_data,
-            "balance_data": balance_data,
-            "profitability_data": profitability_data,
-            "stock_name": stock_name,
+            # Tablolar satır x dönem matrisi olarak bir kez hazırlanır
+            "statements": get_statements(symbol, company),
+            "stock_name": company.get("name") or entry["code"],
         }
 
         # Verileri şablona gönderin
-        return render(request, 'profile_improved.html', {'symbol': symbol, 'stock_data': stock_data})
+        return render(request, 'profile_improved.html', {
+            'symbol': symbol,
+            'stock_data': stock_data,
+            'dark_mode': dark_mode,
+            'fragment_ttl': fragments.FRAGMENT_CACHE_TTL,
+            'fragment_revision': fragment_revision,
+        })
     else:
         # Geçersiz sembol durumunda hata sayfasına yönlendirme
         return render(request, 'error.html', {'error_message': 'Geçersiz sembol: {}'.format(symbol)})
@@ -627,70 +517,238 @@ def tables2 (request):
 def datatables_improved(request):
     return render(request, 'datatables_improved.html')
 
+def get_datatables_data(request):
+    """Server-side paging, sorting and filtering for the datatables page."""
+    if request.method != 'GET':
+        return JsonResponse({'error': 'Method not allowed'}, status=405)
+
+    try:
+        data = query_table(request.GET)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    data['stats']['avg_market_cap_display'] = format_market_cap(data['stats']['avg_market_cap'])
+    return JsonResponse({'success': True, **data})
+
+def screener(request):
+    return render(request, 'screener.html', {'fields': screener_fields()})
+
+def get_screener_data(request):
+    """Run a screen such as ``q=pe_ratio < 10 AND roe > 20`` and return one page of matches."""
+    if request.method != 'GET':
+        return JsonResponse({'error': 'Method not allowed'}, status=405)
+
+    try:
+        data = screen(request.GET)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    return JsonResponse({'success': True, **data})
+
+def get_symbols(request):
+    """Autocomplete: companies whose code or name starts with ``?q=``, optionally within ``?index=BIST30``."""
+    if request.method != 'GET':
+        return JsonResponse({'error': 'Method not allowed'}, status=405)
+
+    try:
+        limit = min(int(request.GET.get('limit', 10)), 50)
+        results = registry.search(request.GET.get('q', ''), limit=max(limit, 1), index=request.GET.get('index') or None)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    return JsonResponse({'success': True, 'results': results})
+
+def get_analytics_data(request):
+    """Return correlation/covariance matrices, betas and sector aggregates for ``?symbols=`` (default: all)."""
+    if request.method != 'GET':
+        return JsonResponse({'error': 'Method not allowed'}, status=405)
+
+    symbols = list(dict.fromkeys(s.strip() for s in request.GET.get('symbols', '').split(',') if s.strip()))
+    try:
+        data = analytics(symbols)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    return JsonResponse({'success': True, **data})
+
 def apexcolumncharts (request): 
     return render(request, 'apexcolumncharts.html') 
 
 def apexlinecharts (request):     
     return render(request, 'apexlinecharts.html')
 
-def get_stock_data_ajax(request, symbol):
+def history_validators(bar, interval, *key):
+    """ETag and Last-Modified for a response built from stored bars up to ``bar``.
+
+    The newest bar's close and volume are part of the ETag because the last
+    bar keeps changing until it closes; until then Last-Modified is "now".
+    """
+    timestamp, close, volume = bar
+    digest = hashlib.sha1(repr((*key, interval, timestamp.timestamp(), close, volume)).encode()).hexdigest()
+    last_modified = min(timestamp + BAR_LENGTH[interval], timezone.now())
+    return f'"{digest[:24]}"', int(last_modified.timestamp())
+
+def parse_max_points(request):
+    """``max_points`` query parameter: a point budget of at least 3, 0 for every bar."""
+    raw = request.GET.get('max_points')
+    if raw in (None, ''):
+        return getattr(settings, 'CHART_MAX_POINTS', 300)
+    max_points = int(raw)
+    if max_points != 0 and max_points < 3:
+        raise ValueError(raw)
+    return max_points
+
+def set_history_cache_headers(response, period, etag, last_modified):
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    patch_cache_control(response, public=True, max_age=PERIODS[period]['max_age'])
+    return response
+
+def is_known_symbol(symbol):
+    """Only registered companies and the analytics benchmark are synced from upstream."""
+    return symbol == ANALYTICS_BENCHMARK or symbol in registry
+
+async def load_period_conditionally(request, symbol, period, *key):
+    """Sync ``symbol`` and answer a conditional GET for one chart period.
+
+    Returns ``(response, frame, validators)``: a 304 response and no frame when
+    the client's copy is current, otherwise no response and the period frame.
+    """
+    interval = PERIODS[period]['interval']
+    await aensure_history(symbol, interval)
+    bar = await sync_to_async(last_bar)(symbol, interval)
+    if bar is None:
+        return None, pd.DataFrame(), None
+
+    # Veri değişmediyse frame hiç okunmadan 304 döner
+    validators = history_validators(bar, interval, symbol, period, *key)
+    not_modified = get_conditional_response(request, etag=validators[0], last_modified=validators[1])
+    if not_modified is not None:
+        return set_history_cache_headers(not_modified, period, *validators), None, validators
+    return None, await sync_to_async(load_period)(symbol, period), validators
+
+async def get_stock_data_ajax(request, symbol):
     """AJAX endpoint to get stock data for different time periods"""
     if request.method != 'GET':
         return JsonResponse({'error': 'Method not allowed'}, status=405)
     
     period = request.GET.get('period', '1y')
     
-    # Map periods to yfinance periods and intervals
-    period_mapping = {
-        '1d': {'period': '1d', 'interval': '1m'},
-        '1w': {'period': '5d', 'interval': '15m'}, 
-        '1m': {'period': '1mo', 'interval': '1d'},
-        '1y': {'period': '1y', 'interval': '1d'},
-        'all': {'period': '5y', 'interval': '1d'}  # 5 years of data
-    }
-    
-    if period not in period_mapping:
+    if period not in PERIODS:
         return JsonResponse({'error': 'Invalid period'}, status=400)
+    try:
+        max_points = parse_max_points(request)
+    except ValueError:
+        return JsonResponse({'error': 'Invalid max_points'}, status=400)
+    try:
+        indicators = parse_indicators(request.GET.get('indicators', ''))
+    except ValueError as e:
+        return JsonResponse({'error': f'Invalid indicators: {e}'}, status=400)
+    # Bilinmeyen semboller upstream'e gitmez ve PriceBar'a yazılmaz
+    if not await sync_to_async(is_known_symbol)(symbol):
+        return JsonResponse({'error': 'Unknown symbol'}, status=404)
     
     try:
-        ticker = yf.Ticker(symbol)
-        
-        # Get historical data
-        hist_data = ticker.history(
-            period=period_mapping[period]['period'],
-            interval=period_mapping[period]['interval']
+        # Get historical data from the local bar store
+        not_modified, hist_data, validators = await load_period_conditionally(
+            request, symbol, period, max_points, *map(indicator_label, indicators),
         )
+        if not_modified is not None:
+            return not_modified
         
         if hist_data.empty:
             return JsonResponse({'error': 'No data available'}, status=404)
         
-        # Reset index to get dates as column
-        hist_data = hist_data.reset_index()
+        # Günlük değişim seyreltmeden önce, son iki gerçek bardan hesaplanır
+        price_change, price_change_pct = calculate_price_change(hist_data)
+        hist_data = downsample(hist_data, max_points)
         
         # Convert to lists for JSON serialization
-        dates = hist_data['Datetime'].dt.strftime('%Y-%m-%d %H:%M:%S').tolist() if 'Datetime' in hist_data.columns else hist_data['Date'].dt.strftime('%Y-%m-%d').tolist()
+        interval = PERIODS[period]['interval']
+        date_format = '%Y-%m-%d' if interval == '1d' else '%Y-%m-%d %H:%M:%S'
+        dates = hist_data['Date'].dt.strftime(date_format).tolist()
         prices = hist_data['Close'].round(2).tolist()
         
-        # Calculate price change
-        if len(prices) > 1:
-            price_change = prices[-1] - prices[-2] if len(prices) > 1 else 0
-            price_change_pct = (price_change / prices[-2]) * 100 if prices[-2] != 0 else 0
-        else:
-            price_change = 0
-            price_change_pct = 0
+        data = {
+            'dates': dates,
+            'prices': prices,
+            'current_price': prices[-1] if prices else 0,
+            'price_change': float(price_change),
+            'price_change_pct': float(price_change_pct),
+            'period': period
+        }
+        if indicators:
+            # Göstergeler periyodun başından önceki barlarla ısınır, sonra
+            # seyreltilmiş fiyat serisinin tarihlerine hizalanır
+            tables = await sync_to_async(symbol_indicators)(symbol, interval, indicators)
+            data['indicators'] = {name: serialize_indicator(table, hist_data['Date']) for name, table in tables.items()}
         
-        return JsonResponse({
-            'success': True,
-            'data': {
-                'dates': dates,
-                'prices': prices,
-                'current_price': prices[-1] if prices else 0,
-                'price_change': round(price_change, 2),
-                'price_change_pct': round(price_change_pct, 2),
-                'period': period
-            }
-        })
+        response = JsonResponse({'success': True, 'data': data})
+        return set_history_cache_headers(response, period, *validators)
         
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=500)
 
+
+
+async def stream_prices(request):
+    """Server-Sent Events stream of live prices for ``?symbols=A.IS,B.IS``.
+
+    Every open stream is fed from one shared upstream poller; see
+    ``core.streaming.PriceHub``. Needs an ASGI server.
+    """
+    if request.method != 'GET':
+        return JsonResponse({'error': 'Method not allowed'}, status=405)
+    # WSGI altında sonsuz akış yanıtı hiç tamamlanmaz
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse({'error': 'Streaming requires an ASGI server'}, status=501)
+
+    symbols = list(dict.fromkeys(s.strip() for s in request.GET.get('symbols', '').split(',') if s.strip()))
+    if not symbols:
+        return JsonResponse({'error': 'No symbols given'}, status=400)
+    if len(symbols) > STREAM_MAX_SYMBOLS:
+        return JsonResponse({'error': f'At most {STREAM_MAX_SYMBOLS} symbols per stream'}, status=400)
+
+    registered = set(await sync_to_async(registry.symbols)())
+    known = [symbol for symbol in symbols if symbol in registered]
+    if not known:
+        return JsonResponse({'error': 'Unknown symbols'}, status=404)
+
+    response = StreamingHttpResponse(price_events(known), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+async def get_chart_data(request, symbol):
+    """Compact close-price series for client-side chart rendering"""
+    if request.method != 'GET':
+        return JsonResponse({'error': 'Method not allowed'}, status=405)
+
+    period = request.GET.get('period', 'all')
+    encoding = request.GET.get('encoding', 'delta')
+
+    if period not in PERIODS:
+        return JsonResponse({'error': 'Invalid period'}, status=400)
+    if encoding not in ENCODINGS:
+        return JsonResponse({'error': 'Invalid encoding'}, status=400)
+    try:
+        max_points = parse_max_points(request)
+    except ValueError:
+        return JsonResponse({'error': 'Invalid max_points'}, status=400)
+    if not await sync_to_async(is_known_symbol)(symbol):
+        return JsonResponse({'error': 'Unknown symbol'}, status=404)
+
+    try:
+        not_modified, hist_data, validators = await load_period_conditionally(request, symbol, period, encoding, max_points)
+        if not_modified is not None:
+            return not_modified
+        if hist_data.empty:
+            return JsonResponse({'error': 'No data available'}, status=404)
+
+        response = JsonResponse({
+            'success': True,
+            'symbol': symbol,
+            'period': period,
+            'data': encode_series(downsample(hist_data, max_points), encoding),
+        })
+        return set_history_cache_headers(response, period, *validators)
+
+    except Exception as e:
+        return JsonResponse({'error': str(e)}, status=500)
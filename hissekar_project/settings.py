@@ -57,8 +57,8 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     
     # other middleware classes
-    'htmlmin.middleware.HtmlMinifyMiddleware',
-    'htmlmin.middleware.MarkRequestMiddleware', 
+    'core.middleware.HtmlMinifyMiddleware',
+    'core.middleware.MarkRequestMiddleware',
 
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -101,6 +101,25 @@ DATABASES = {
     }
 }
 
+# Cache
+# https://docs.djangoproject.com/en/5.0/topics/cache/
+# Sayfa parçaları ({% cache %}) burada tutulur. Parça anahtarları verinin kendisinden
+# (içerik özeti, fiyatların yazıldığı an) türetildiğinden locmem ile de başka süreçteki
+# güncellemeler görülür; worker'lar hazır parçaları paylaşsın isterseniz:
+#   'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': BASE_DIR / 'cache'
+#   'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': 'redis://127.0.0.1:6379'
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'hissekar',
+        'OPTIONS': {'MAX_ENTRIES': 1000},
+    }
+}
+
+# Profil ve marketcap sayfalarındaki önbelleğe alınmış parçaların ömrü
+FRAGMENT_CACHE_TTL = 15 * 60  # seconds
+
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
 
@@ -135,6 +154,25 @@ HTML_MINIFY = False
 
 X_FRAME_OPTIONS = 'SAMEORIGIN'
 
+# yfinance ticker.info cache (per worker process)
+TICKER_INFO_CACHE_TTL = 900  # seconds
+TICKER_INFO_CACHE_SIZE = 256
+
+# Rendered Plotly chart cache (per worker process)
+FIGURE_CACHE_TTL = 6 * 60 * 60  # seconds
+FIGURE_CACHE_SIZE = 128
+
+# Profil sayfasındaki hazır finansal tablolar (per worker process)
+STATEMENT_CACHE_TTL = 6 * 60 * 60  # seconds
+STATEMENT_CACHE_SIZE = 256
+
+# Profil fiyat grafiği: True ise seri sayfa açıldıktan sonra /api/chart-data/
+# üzerinden yüklenip tarayıcıda çizilir, False ise sunucuda Plotly HTML üretilir
+PRICE_CHART_CLIENT_SIDE = True
+
+# Borsa İstanbul saat dilimi, fiyat barları bu dilimde gösterilir
+MARKET_TIME_ZONE = 'Europe/Istanbul'
+
 # Static files (CSS, JavaScript, Images)
 # https://docs.djangoproject.com/en/5.0/howto/static-files/
 
@@ -146,3 +184,38 @@ print(STATIC_DIR)
 # https://docs.djangoproject.com/en/5.0/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Screener'ın tüm şirketler için tuttuğu oran/fiyat tablosu (per worker process)
+SCREENER_CACHE_TTL = 300  # seconds
+
+# Canlı fiyat akışı (/api/stream/prices/, yalnızca ASGI altında)
+STREAM_POLL_INTERVAL = 15  # seconds, tek upstream isteği tüm izleyicilere dağıtılır
+STREAM_HEARTBEAT = 20  # seconds
+STREAM_MAX_SYMBOLS = 50
+
+# yfinance istemcisi: hız sınırı, yeniden deneme ve devre kesici (per worker process)
+UPSTREAM_RATE = 4  # requests per second
+UPSTREAM_BURST = 20
+UPSTREAM_MAX_WAIT = 10  # seconds to wait for a rate-limit token
+UPSTREAM_RETRIES = 2
+UPSTREAM_BACKOFF = 0.5  # seconds, doubled on each retry
+UPSTREAM_FAILURE_THRESHOLD = 5
+UPSTREAM_RESET_TIMEOUT = 60  # seconds before a trial request is let through
+
+# Fiyat grafikleri ve /api/stock-data/, /api/chart-data/ için varsayılan nokta sayısı
+# (LTTB ile seyreltilir; ?max_points=0 tüm barları döndürür)
+CHART_MAX_POINTS = 300
+
+# /api/stock-data/?indicators=... için hesaplanan gösterge tabloları (per worker process)
+INDICATOR_CACHE_TTL = 6 * 60 * 60  # seconds
+INDICATOR_CACHE_SIZE = 512
+
+# /api/analytics/: getiri korelasyonu, XU100 betası ve sektör özetleri (per worker process)
+ANALYTICS_BENCHMARK = 'XU100.IS'
+ANALYTICS_WINDOW = 252  # daily returns
+ANALYTICS_MIN_PERIODS = 20
+ANALYTICS_CACHE_TTL = 6 * 60 * 60  # seconds, then recomputed from scratch
+
+# Bellekteki sembol kayıt defteri (per worker process); import sonrası hemen,
+# diğer worker'larda en geç bu süre sonunda yenilenir
+SYMBOL_REGISTRY_TTL = 300  # seconds